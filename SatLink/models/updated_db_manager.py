@@ -8,9 +8,194 @@ SatLink database with user authentication and sharing capabilities.
 import sqlite3
 import json
 import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Union, Any
+from typing import Optional, Dict, List, Tuple, Union, Any, Callable
 from .user_auth import UserAuth
+from .updated_satlink_db_schema import UPDATED_SQL_UPGRADES
+
+
+# The table a statement is about (its first FROM/INTO/UPDATE target; joins
+# such as the owner's username are not counted), for trace_queries()
+PRIMARY_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+
+# gather() workers add to the Counter of the thread that traces the queries
+_QUERY_COUNT_LOCK = threading.Lock()
+
+# Single-row statements run on every detail/edit/share/delete request. Kept
+# as module constants so each stays one entry in the connection's
+# prepared-statement cache (see SatLinkDatabaseUser._conn)
+SELECT_SATELLITE_POSITION = """
+    SELECT sp.*, u.username as owner
+    FROM satellite_positions sp
+    JOIN users u ON sp.user_id = u.id
+    WHERE sp.id = ?
+"""
+
+SELECT_TRANSPONDER = """
+    SELECT t.*, u.username as owner, sp.name as satellite_name,
+           sp.sat_long as sat_long, sp.sat_lat as sat_lat
+    FROM transponders t
+    JOIN users u ON t.user_id = u.id
+    LEFT JOIN satellite_positions sp ON t.satellite_id = sp.id
+    WHERE t.id = ?
+"""
+
+SELECT_CARRIER = """
+    SELECT c.*, u.username as owner
+    FROM carriers c
+    JOIN users u ON c.user_id = u.id
+    WHERE c.id = ?
+"""
+
+SELECT_GROUND_STATION = """
+    SELECT gs.*, u.username as owner
+    FROM ground_stations gs
+    JOIN users u ON gs.user_id = u.id
+    WHERE gs.id = ?
+"""
+
+SELECT_LINK_CALCULATION = """
+    SELECT lc.*, u.username as owner
+    FROM link_calculations lc
+    JOIN users u ON lc.user_id = u.id
+    WHERE lc.id = ?
+"""
+
+SELECT_RECEPTION_COMPLEX = """
+    SELECT rc.*, u.username as owner
+    FROM reception_complex rc
+    JOIN users u ON rc.user_id = u.id
+    WHERE rc.id = ?
+"""
+
+SELECT_RECEPTION_SIMPLE = """
+    SELECT rs.*, u.username as owner
+    FROM reception_simple rs
+    JOIN users u ON rs.user_id = u.id
+    WHERE rs.id = ?
+"""
+
+# Both reception tables of one user in a single statement; the columns the
+# other kind lacks are NULL, and ``kind`` tells the rows apart
+SELECT_USER_RECEPTION_SYSTEMS = """
+    SELECT 'complex' AS kind, id, name, ground_station_id, manufacturer, model,
+           description, is_shared, ant_size, ant_eff, lnb_gain, lnb_temp,
+           coupling_loss, cable_loss, polarization_loss, max_depoint, calculated_gt,
+           NULL AS gt_value, NULL AS depoint_loss, NULL AS frequency,
+           NULL AS measurement_method
+    FROM reception_complex
+    WHERE user_id = ?
+    UNION ALL
+    SELECT 'simple' AS kind, id, name, ground_station_id, manufacturer, model,
+           description, is_shared, NULL, NULL, NULL, NULL,
+           NULL, NULL, NULL, NULL, NULL,
+           gt_value, depoint_loss, frequency,
+           measurement_method
+    FROM reception_simple
+    WHERE user_id = ?
+    ORDER BY name
+"""
+
+# Flip is_shared on a row owned by the given user and read back the new value
+TOGGLE_SHARE = {
+    table: f"""
+    UPDATE {table}
+    SET is_shared = NOT is_shared, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND user_id = ?
+    RETURNING is_shared
+"""
+    for table in ('satellite_positions', 'transponders', 'carriers', 'ground_stations',
+                  'reception_complex', 'reception_simple')
+}
+
+# Tables whose rows belong to a user, see check_owner() and get_row()
+OWNED_TABLES = frozenset(('satellite_positions', 'transponders', 'carriers', 'ground_stations',
+                          'reception_complex', 'reception_simple', 'link_calculations'))
+
+
+class _CountingCursor(sqlite3.Cursor):
+    """Cursor that reports each execute()/executemany() call to its connection"""
+
+    def execute(self, sql, parameters=()):
+        self.connection.count_statement(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection.count_statement(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class _CountingConnection(sqlite3.Connection):
+    """
+    Connection that counts the statements callers issue, for trace_queries()
+
+    Only calls made from Python are counted: one per execute() or
+    executemany(), however many rows the latter binds, and none for
+    statements run by triggers. (A trace callback sees all of those.)
+    """
+
+    # Counter of statements per table while trace_queries() is active
+    query_counts = None
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        # Connection.execute() runs on a fresh cursor() without going through
+        # the cursor's Python execute(), so count here
+        self.count_statement(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.count_statement(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+    def count_statement(self, sql):
+        if self.query_counts is not None:
+            match = PRIMARY_TABLE.search(sql)
+            if match:
+                with _QUERY_COUNT_LOCK:
+                    self.query_counts[match.group(1)] += 1
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps only the ``maxsize`` most recently used entries
+
+    Used for the version-keyed result caches: entries of stale versions are
+    never hit again and simply age out.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
 
 
 class SatLinkDatabaseUser:
@@ -20,7 +205,7 @@ class SatLinkDatabaseUser:
     Handles all database operations with user authentication and sharing support.
     """
 
-    def __init__(self, db_path: str = 'satlink.db'):
+    def __init__(self, db_path: str = 'satlink.db', gather_workers: int = 4):
         """
         Initialize the database manager
 
@@ -28,11 +213,81 @@ class SatLinkDatabaseUser:
         ----------
         db_path : str
             Path to the SQLite database file
+        gather_workers : int
+            Worker threads shared by all gather() calls; a threaded server
+            should pass its own thread count
         """
         self.db_path = db_path
         self.user_auth = UserAuth(db_path)
+        # One long-lived connection per thread, see _conn(), and the current
+        # user of each thread. All connections are also listed so close() can
+        # reach the ones of other threads.
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.current_user_id = None
         self.session_token = None
+        # Per-table change counters, used by the web layer to key its caches
+        self._table_versions = {}
+        # list_satellite_positions results: (user_id, include_shared) -> (version, rows)
+        self._satellite_list_cache = LRUCache(maxsize=128)
+        # Workers for gather(); each keeps its own connection
+        self._executor = ThreadPoolExecutor(max_workers=gather_workers,
+                                            thread_name_prefix='satlink-db')
+        # WAL lets readers proceed during a write. The mode is stored in the
+        # database file, so it only has to be set once, not per connection.
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+        self._upgrade_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Get this thread's database connection, opening it on first use
+
+        The connection is kept open for the lifetime of the thread, so
+        requests do not pay for opening the file and replaying PRAGMAs.
+        Use it as ``with self._conn() as conn:``; the context manager commits
+        or rolls back the transaction but does not close the connection.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection with ``sqlite3.Row`` rows, in WAL mode
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Roomy statement cache: the connection lives as long as the
+            # thread, so each distinct statement is parsed only once.
+            # check_same_thread is off only so close() can close it; the
+            # connection is still used by its own thread alone.
+            conn = sqlite3.connect(self.db_path, cached_statements=256,
+                                   check_same_thread=False,
+                                   factory=_CountingConnection)
+            conn.row_factory = sqlite3.Row
+            # With WAL (switched on once in __init__), NORMAL stays consistent
+            # without an fsync on every commit. These settings are
+            # per-connection, so they are applied to each new connection.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            # 20 MB page cache (negative = KiB) instead of the default 2 MB
+            conn.execute("PRAGMA cache_size=-20000")
+            # Read pages through a shared memory map instead of read() calls
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _upgrade_schema(self):
+        """
+        Create tables, indexes and triggers that the database file may predate
+
+        Does nothing until the schema has been created (link_calculations is
+        its last table), since the tables they belong to do not exist yet.
+        """
+        with self._conn() as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='link_calculations'").fetchone():
+                conn.executescript(UPDATED_SQL_UPGRADES)
 
     def login(self, username: str, password: str) -> bool:
         """
@@ -57,6 +312,22 @@ class SatLinkDatabaseUser:
             return True
         return False
 
+    @property
+    def current_user_id(self) -> Optional[int]:
+        """
+        ID of the logged-in user, or None
+
+        Kept per thread: a threaded web server handles each request on one
+        thread and sets the user from that request's session, so concurrent
+        requests of different users cannot see each other's ID. gather()
+        hands the caller's user to its workers.
+        """
+        return getattr(self._local, 'user_id', None)
+
+    @current_user_id.setter
+    def current_user_id(self, user_id: Optional[int]):
+        self._local.user_id = user_id
+
     def logout(self):
         """Logout current user"""
         if self.session_token:
@@ -77,6 +348,243 @@ class SatLinkDatabaseUser:
             return self.user_auth.get_user_info(self.current_user_id)
         return None
 
+    def get_version(self, table: str) -> int:
+        """
+        Get the change counter of a table
+
+        The counter is bumped every time rows of the table are modified
+        through this manager, so it can be used as part of a cache key.
+
+        Parameters
+        ----------
+        table : str
+            Table name
+
+        Returns
+        -------
+        int
+            Current version of the table
+        """
+        return self._table_versions.get(table, 0)
+
+    def bump_version(self, *tables: str):
+        """Mark tables as modified, invalidating caches keyed on their version"""
+        for table in tables:
+            self._table_versions[table] = self._table_versions.get(table, 0) + 1
+
+    def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """
+        Run independent read calls concurrently
+
+        The first call runs on the calling thread, the others on worker
+        threads with their own connections, as the caller's current user;
+        SQLite releases the GIL while executing, so the queries of a page
+        that needs several lists overlap instead of running back to back.
+        While the caller is inside trace_queries(), the workers' statements
+        are counted in the caller's Counter.
+
+        Parameters
+        ----------
+        *calls : callable
+            Zero-argument callables, e.g. ``lambda: db.list_carriers()``
+
+        Returns
+        -------
+        list
+            The results, in the order of ``calls``
+        """
+        if not calls:
+            return []
+
+        user_id = self.current_user_id
+        query_counts = self._conn().query_counts
+
+        def run(call):
+            # The worker acts for the user of the calling thread, and its
+            # statements count towards that thread's trace
+            self.current_user_id = user_id
+            conn = self._conn()
+            conn.query_counts = query_counts
+            try:
+                return call()
+            finally:
+                conn.query_counts = None
+
+        futures = [self._executor.submit(run, call) for call in calls[1:]]
+        first = calls[0]()
+        return [first] + [future.result() for future in futures]
+
+    def _toggle_share(self, table: str, item_id: int) -> Optional[bool]:
+        """Flip is_shared of an owned row in one UPDATE ... RETURNING, see TOGGLE_SHARE"""
+        if not self.current_user_id:
+            raise PermissionError("Login required")
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(TOGGLE_SHARE[table], (item_id, self.current_user_id))
+            row = cursor.fetchone()
+            conn.commit()
+
+        if row is None:
+            return None
+        self.bump_version(table)
+        return bool(row[0])
+
+    def get_row(self, table: str, row_id: int, *, user_id: int = None) -> Optional[Dict]:
+        """
+        Get one row of a user-owned table by primary key
+
+        Handlers that need a single row should fetch it by ID here (or with
+        the typed get_* methods), never by scanning a list_* result.
+
+        Parameters
+        ----------
+        table : str
+            One of OWNED_TABLES
+        row_id : int
+            Row ID
+        user_id : int, optional
+            Only return the row if this user owns it
+
+        Returns
+        -------
+        dict or None
+            The row's columns, or None if it does not exist (or is not owned
+            by ``user_id``)
+        """
+        if table not in OWNED_TABLES:
+            raise ValueError(f"Not an owned table: {table}")
+
+        sql = f"SELECT * FROM {table} WHERE id = ?"
+        params = [row_id]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+
+        with self._conn() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def check_owner(self, table: str, row_id: int, user_id: int = None) -> bool:
+        """
+        Check whether a row exists and belongs to a user
+
+        Parameters
+        ----------
+        table : str
+            One of OWNED_TABLES
+        row_id : int
+            Row ID
+        user_id : int, optional
+            Owner to check for (default: current user)
+
+        Returns
+        -------
+        bool
+            True if the row exists and is owned by the user
+        """
+        if table not in OWNED_TABLES:
+            raise ValueError(f"Not an owned table: {table}")
+
+        if user_id is None:
+            user_id = self.current_user_id
+        if not user_id:
+            return False
+
+        with self._conn() as conn:
+            row = conn.execute(f"SELECT 1 FROM {table} WHERE id = ? AND user_id = ? LIMIT 1",
+                               (row_id, user_id)).fetchone()
+        return row is not None
+
+    @contextmanager
+    def trace_queries(self):
+        """
+        Count the statements this thread runs, per table they are about
+
+        Counts the statements issued on the thread's connection for the
+        duration of the block, so a handler that queries the same table over
+        and over (an N+1 pattern, or a list fetched only to pick one row) can
+        be spotted. Each execute()/executemany() call counts once; trigger
+        sub-statements do not count. Queries that gather() runs on its
+        workers for this thread count too.
+
+        Yields
+        ------
+        collections.Counter
+            Number of statements per table name, filled in as they run
+        """
+        conn = self._conn()
+        counts = Counter()
+
+        conn.query_counts = counts
+        try:
+            yield counts
+        finally:
+            conn.query_counts = None
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """
+        Run a single statement on this thread's connection and commit it
+
+        Meant for statements without result rows (INSERT/UPDATE/DELETE);
+        callers are responsible for bump_version() on the tables they change.
+
+        Parameters
+        ----------
+        sql : str
+            SQL statement with ``?`` placeholders
+        params : tuple
+            Statement parameters
+
+        Returns
+        -------
+        sqlite3.Cursor
+            The cursor, for ``rowcount`` and ``lastrowid``
+        """
+        with self._conn() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        """
+        Run a statement once per parameter tuple in one committed transaction
+
+        Parameters
+        ----------
+        sql : str
+            SQL statement with ``?`` placeholders
+        seq_of_params : iterable of tuple
+            Parameters for each execution
+
+        Returns
+        -------
+        sqlite3.Cursor
+            The cursor, for ``rowcount``
+        """
+        with self._conn() as conn:
+            return conn.executemany(sql, seq_of_params)
+
+    def execute_read(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """
+        Run a SELECT on this thread's connection and fetch all rows
+
+        Unlike execute(), nothing is committed. The statement stays in the
+        connection's statement cache, so repeating the same SQL text skips
+        parsing and planning.
+
+        Parameters
+        ----------
+        sql : str
+            SELECT statement with ``?`` placeholders
+        params : tuple
+            Statement parameters
+
+        Returns
+        -------
+        list of sqlite3.Row
+            The result rows
+        """
+        return self._conn().execute(sql, params).fetchall()
+
     # =========================================================================
     # Satellite Positions
     # =========================================================================
@@ -112,7 +620,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add satellite position")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO satellite_positions
@@ -121,6 +629,7 @@ class SatLinkDatabaseUser:
             """, (name, sat_long, sat_lat, h_sat, orbit_type, description,
                   self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('satellite_positions')
             return cursor.lastrowid
 
     def list_satellite_positions(self, user_id: Optional[int] = None,
@@ -140,12 +649,19 @@ class SatLinkDatabaseUser:
         list
             List of satellite positions
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        if user_id is None:
+            user_id = self.current_user_id
 
-            if user_id is None:
-                user_id = self.current_user_id
+        # The list feeds most dropdowns but rarely changes: reuse it until a
+        # write bumps the table version. Callers get their own dicts.
+        key = (user_id, include_shared)
+        version = self.get_version('satellite_positions')
+        cached = self._satellite_list_cache.get(key)
+        if cached and cached[0] == version:
+            return [dict(sat) for sat in cached[1]]
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
 
             if user_id and include_shared:
                 cursor.execute("""
@@ -177,7 +693,61 @@ class SatLinkDatabaseUser:
                 sat = dict(row)
                 satellites.append(sat)
 
-            return satellites
+        self._satellite_list_cache[key] = (version, satellites)
+        return [dict(sat) for sat in satellites]
+
+    def count_satellite_positions(self, user_id: Optional[int] = None,
+                                  include_shared: bool = True) -> int:
+        """
+        Count the satellite positions list_satellite_positions() would return
+
+        Parameters
+        ----------
+        user_id : int, optional
+            User ID to filter by. If None, uses current user
+        include_shared : bool
+            Whether to include shared items from other users
+
+        Returns
+        -------
+        int
+            Number of satellite positions
+        """
+        if user_id is None:
+            user_id = self.current_user_id
+
+        if user_id and include_shared:
+            condition, params = "user_id = ? OR is_shared = 1", (user_id,)
+        elif user_id:
+            condition, params = "user_id = ?", (user_id,)
+        else:
+            condition, params = "is_shared = 1", ()
+
+        with self._conn() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM satellite_positions WHERE {condition}",
+                                params).fetchone()[0]
+
+    def get_satellite_position(self, sat_id: int) -> Optional[Dict]:
+        """
+        Get a single satellite position by ID
+
+        Parameters
+        ----------
+        sat_id : int
+            Satellite position ID
+
+        Returns
+        -------
+        dict or None
+            Satellite position, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_SATELLITE_POSITION, (sat_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def update_satellite_position(self, sat_id: int, **kwargs) -> bool:
         """
@@ -198,7 +768,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             # Check ownership
@@ -228,6 +798,7 @@ class SatLinkDatabaseUser:
                 WHERE id = ?
             """, values)
             conn.commit()
+            self.bump_version('satellite_positions')
             return cursor.rowcount > 0
 
     def delete_satellite_position(self, sat_id: int) -> bool:
@@ -247,28 +818,23 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
-            # Check ownership and delete related transponders
+            # Delete satellite, checking ownership in the same statement
             cursor.execute("""
-                SELECT user_id FROM satellite_positions WHERE id = ?
-            """, (sat_id,))
-            result = cursor.fetchone()
-            if not result or result[0] != self.current_user_id:
+                DELETE FROM satellite_positions WHERE id = ? AND user_id = ?
+            """, (sat_id, self.current_user_id))
+            if cursor.rowcount == 0:
                 raise PermissionError("Only owner can delete satellite")
 
-            # Delete related transponders first
+            # Delete related transponders
             cursor.execute("""
                 DELETE FROM transponders WHERE satellite_id = ?
             """, (sat_id,))
-
-            # Delete satellite
-            cursor.execute("""
-                DELETE FROM satellite_positions WHERE id = ?
-            """, (sat_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            self.bump_version('satellite_positions', 'transponders')
+            return True
 
     def make_satellite_public(self, sat_id: int) -> bool:
         """Make satellite position public"""
@@ -278,6 +844,23 @@ class SatLinkDatabaseUser:
         """Make satellite position private"""
         return self.update_satellite_position(sat_id, is_shared=False)
 
+    def toggle_satellite_share(self, sat_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a satellite position (requires ownership)
+
+        Parameters
+        ----------
+        sat_id : int
+            Satellite ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the satellite does not exist or
+            is owned by another user
+        """
+        return self._toggle_share('satellite_positions', sat_id)
+
     # =========================================================================
     # Transponders
     # =========================================================================
@@ -321,7 +904,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add transponder")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO transponders
@@ -331,10 +914,18 @@ class SatLinkDatabaseUser:
             """, (name, freq, freq_band, eirp_max, b_transp, back_off, contorno,
                   polarization, satellite_id, self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('transponders')
             return cursor.lastrowid
 
+    # Columns that may be requested from list_transponders(columns=...)
+    TRANSPONDER_COLUMNS = ('id', 'name', 'satellite_id', 'freq', 'freq_band', 'eirp_max',
+                           'b_transp', 'back_off', 'contorno', 'polarization',
+                           'description', 'user_id', 'is_shared', 'created_at', 'updated_at')
+
     def list_transponders(self, satellite_id: int = None, user_id: int = None,
-                         include_shared: bool = True) -> List[Dict]:
+                         include_shared: bool = True,
+                         columns: Optional[List[str]] = None,
+                         as_rows: bool = False) -> List[Union[Dict, sqlite3.Row]]:
         """
         List transponders
 
@@ -346,26 +937,44 @@ class SatLinkDatabaseUser:
             User ID to filter by
         include_shared : bool
             Whether to include shared items
+        columns : list of str, optional
+            Select only these transponder columns. The rows are then returned
+            as ``sqlite3.Row`` tuples in this column order, without the owner
+            and satellite joins
+        as_rows : bool
+            Return the ``sqlite3.Row`` objects instead of dicts. Rows support
+            ``row['col']`` (and attribute access in templates) but not
+            ``.get()`` or mutation, at a fraction of a dict's memory
 
         Returns
         -------
         list
             List of transponders
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        if columns:
+            unknown = set(columns) - set(self.TRANSPONDER_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown transponder columns: {sorted(unknown)}")
+
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             if user_id is None:
                 user_id = self.current_user_id
 
-            query = """
-                SELECT t.*, u.username as owner, sp.name as satellite_name,
-                       sp.sat_long as sat_long, sp.sat_lat as sat_lat
-                FROM transponders t
-                JOIN users u ON t.user_id = u.id
-                LEFT JOIN satellite_positions sp ON t.satellite_id = sp.id
-            """
+            if columns:
+                query = f"""
+                    SELECT {', '.join(f't.{col}' for col in columns)}
+                    FROM transponders t
+                """
+            else:
+                query = """
+                    SELECT t.*, u.username as owner, sp.name as satellite_name,
+                           sp.sat_long as sat_long, sp.sat_lat as sat_lat
+                    FROM transponders t
+                    JOIN users u ON t.user_id = u.id
+                    LEFT JOIN satellite_positions sp ON t.satellite_id = sp.id
+                """
 
             conditions = []
             params = []
@@ -390,6 +999,9 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
 
+            if columns or as_rows:
+                return cursor.fetchall()
+
             transponders = []
             for row in cursor.fetchall():
                 tp = dict(row)
@@ -397,6 +1009,28 @@ class SatLinkDatabaseUser:
 
             return transponders
 
+    def get_transponder(self, tp_id: int) -> Optional[Dict]:
+        """
+        Get a single transponder by ID
+
+        Parameters
+        ----------
+        tp_id : int
+            Transponder ID
+
+        Returns
+        -------
+        dict or None
+            Transponder, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_TRANSPONDER, (tp_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def update_transponder(self, tp_id: int, **kwargs) -> bool:
         """
         Update transponder
@@ -414,7 +1048,7 @@ class SatLinkDatabaseUser:
         bool
             True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             # Build UPDATE query dynamically
@@ -437,6 +1071,7 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
             conn.commit()
+            self.bump_version('transponders')
             return cursor.rowcount > 0
 
     def make_transponder_public(self, tp_id: int) -> bool:
@@ -447,6 +1082,23 @@ class SatLinkDatabaseUser:
         """Make transponder private"""
         return self.update_transponder(tp_id, is_shared=False)
 
+    def toggle_transponder_share(self, tp_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a transponder (requires ownership)
+
+        Parameters
+        ----------
+        tp_id : int
+            Transponder ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the transponder does not exist or
+            is owned by another user
+        """
+        return self._toggle_share('transponders', tp_id)
+
     # =========================================================================
     # Carriers
     # =========================================================================
@@ -491,7 +1143,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add carrier")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO carriers
@@ -502,9 +1154,11 @@ class SatLinkDatabaseUser:
                   spectral_efficiency, standard, description,
                   self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('carriers')
             return cursor.lastrowid
 
-    def list_carriers(self, user_id: int = None, include_shared: bool = True) -> List[Dict]:
+    def list_carriers(self, user_id: int = None, include_shared: bool = True,
+                      as_rows: bool = False) -> List[Union[Dict, sqlite3.Row]]:
         """
         List carrier configurations
 
@@ -514,14 +1168,17 @@ class SatLinkDatabaseUser:
             User ID to filter by
         include_shared : bool
             Whether to include shared items
+        as_rows : bool
+            Return the ``sqlite3.Row`` objects instead of dicts. Rows support
+            ``row['col']`` (and attribute access in templates) but not
+            ``.get()`` or mutation, at a fraction of a dict's memory
 
         Returns
         -------
         list
             List of carriers
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             if user_id is None:
@@ -552,6 +1209,9 @@ class SatLinkDatabaseUser:
                     ORDER BY c.name
                 """)
 
+            if as_rows:
+                return cursor.fetchall()
+
             carriers = []
             for row in cursor.fetchall():
                 car = dict(row)
@@ -559,6 +1219,28 @@ class SatLinkDatabaseUser:
 
             return carriers
 
+    def get_carrier(self, car_id: int) -> Optional[Dict]:
+        """
+        Get a single carrier configuration by ID
+
+        Parameters
+        ----------
+        car_id : int
+            Carrier ID
+
+        Returns
+        -------
+        dict or None
+            Carrier, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_CARRIER, (car_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def update_carrier(self, car_id: int, **kwargs) -> bool:
         """
         Update carrier
@@ -576,7 +1258,7 @@ class SatLinkDatabaseUser:
         bool
             True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             # Build UPDATE query dynamically
@@ -599,6 +1281,7 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
             conn.commit()
+            self.bump_version('carriers')
             return cursor.rowcount > 0
 
     def make_carrier_public(self, car_id: int) -> bool:
@@ -609,6 +1292,23 @@ class SatLinkDatabaseUser:
         """Make carrier private"""
         return self.update_carrier(car_id, is_shared=False)
 
+    def toggle_carrier_share(self, car_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a carrier (requires ownership)
+
+        Parameters
+        ----------
+        car_id : int
+            Carrier ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the carrier does not exist or
+            is owned by another user
+        """
+        return self._toggle_share('carriers', car_id)
+
     # =========================================================================
     # Ground Stations
     # =========================================================================
@@ -657,7 +1357,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add ground station")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO ground_stations
@@ -668,10 +1368,12 @@ class SatLinkDatabaseUser:
                   city, climate_zone, itu_region, description,
                   self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('ground_stations')
             return cursor.lastrowid
 
     def list_ground_stations(self, country: str = None, user_id: int = None,
-                           include_shared: bool = True) -> List[Dict]:
+                           include_shared: bool = True,
+                           as_rows: bool = False) -> List[Union[Dict, sqlite3.Row]]:
         """
         List ground stations
 
@@ -683,14 +1385,17 @@ class SatLinkDatabaseUser:
             User ID to filter by
         include_shared : bool
             Whether to include shared items
+        as_rows : bool
+            Return the ``sqlite3.Row`` objects instead of dicts. Rows support
+            ``row['col']`` (and attribute access in templates) but not
+            ``.get()`` or mutation, at a fraction of a dict's memory
 
         Returns
         -------
         list
             List of ground stations
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             if user_id is None:
@@ -725,12 +1430,76 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
 
+            if as_rows:
+                return cursor.fetchall()
+
             ground_stations = []
             for row in cursor.fetchall():
                 gs = dict(row)
                 ground_stations.append(gs)
 
-            return ground_stations
+            return ground_stations
+
+    def list_distinct_countries(self, user_id: int = None,
+                                include_shared: bool = True) -> List[str]:
+        """
+        List the distinct countries of ground stations
+
+        Parameters
+        ----------
+        user_id : int, optional
+            User ID to filter by
+        include_shared : bool
+            Whether to include shared items
+
+        Returns
+        -------
+        list
+            Sorted country names, without empty values
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            if user_id is None:
+                user_id = self.current_user_id
+
+            if user_id and include_shared:
+                condition, params = "(user_id = ? OR is_shared = 1)", (user_id,)
+            elif user_id:
+                condition, params = "user_id = ?", (user_id,)
+            else:
+                condition, params = "is_shared = 1", ()
+
+            cursor.execute(f"""
+                SELECT DISTINCT country
+                FROM ground_stations
+                WHERE {condition} AND country IS NOT NULL AND country != ''
+                ORDER BY country
+            """, params)
+
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_ground_station(self, gs_id: int) -> Optional[Dict]:
+        """
+        Get a single ground station by ID
+
+        Parameters
+        ----------
+        gs_id : int
+            Ground station ID
+
+        Returns
+        -------
+        dict or None
+            Ground station, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_GROUND_STATION, (gs_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
     def update_ground_station(self, gs_id: int, **kwargs) -> bool:
         """
@@ -749,7 +1518,7 @@ class SatLinkDatabaseUser:
         bool
             True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             # Build UPDATE query dynamically
@@ -772,8 +1541,42 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
             conn.commit()
+            self.bump_version('ground_stations')
             return cursor.rowcount > 0
 
+    def delete_ground_station(self, gs_id: int) -> bool:
+        """
+        Delete ground station and its reception systems (requires ownership)
+
+        Parameters
+        ----------
+        gs_id : int
+            Ground station ID
+
+        Returns
+        -------
+        bool
+            True if deleted, False if the ground station does not exist or
+            belongs to another user
+        """
+        if not self.current_user_id:
+            raise PermissionError("Login required")
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            # Ownership is part of the DELETE itself; trg_ground_station_delete
+            # removes the reception systems within the same statement
+            cursor.execute("""
+                DELETE FROM ground_stations WHERE id = ? AND user_id = ?
+            """, (gs_id, self.current_user_id))
+            if cursor.rowcount == 0:
+                return False
+
+            conn.commit()
+            self.bump_version('ground_stations', 'reception_complex', 'reception_simple')
+            return True
+
     def make_ground_station_public(self, gs_id: int) -> bool:
         """Make ground station public"""
         return self.update_ground_station(gs_id, is_shared=True)
@@ -782,6 +1585,23 @@ class SatLinkDatabaseUser:
         """Make ground station private"""
         return self.update_ground_station(gs_id, is_shared=False)
 
+    def toggle_ground_station_share(self, gs_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a ground station (requires ownership)
+
+        Parameters
+        ----------
+        gs_id : int
+            Ground station ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the ground station does not exist or
+            is owned by another user
+        """
+        return self._toggle_share('ground_stations', gs_id)
+
     # =========================================================================
     # Reception Systems - Complex
     # =========================================================================
@@ -832,7 +1652,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add reception system")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO reception_complex
@@ -845,8 +1665,35 @@ class SatLinkDatabaseUser:
                   manufacturer, model, description,
                   self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('reception_complex')
             return cursor.lastrowid
 
+    def add_reception_complex_bulk(self, rows: List[tuple]) -> List[int]:
+        """
+        Add several complex reception systems in one transaction (requires login)
+
+        Parameters
+        ----------
+        rows : list of tuple
+            One tuple per system with all arguments of add_reception_complex,
+            in order (name, ant_size, ..., description, is_shared)
+
+        Returns
+        -------
+        list of int
+            IDs of the new reception systems, in the order of ``rows``
+        """
+        if not self.current_user_id:
+            raise PermissionError("Login required to add reception system")
+
+        return self._insert_bulk('reception_complex', """
+            INSERT INTO reception_complex
+            (name, ant_size, ant_eff, lnb_gain, lnb_temp,
+             coupling_loss, cable_loss, polarization_loss, max_depoint,
+             manufacturer, model, description, is_shared, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
     # =========================================================================
     # Reception Systems - Simple
     # =========================================================================
@@ -887,7 +1734,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add reception system")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO reception_simple
@@ -898,9 +1745,66 @@ class SatLinkDatabaseUser:
                   measurement_method, manufacturer, model, description,
                   self.current_user_id, is_shared))
             conn.commit()
+            self.bump_version('reception_simple')
             return cursor.lastrowid
 
-    def list_reception_complex(self, user_id: int = None, include_shared: bool = True) -> List[Dict]:
+    def add_reception_simple_bulk(self, rows: List[tuple]) -> List[int]:
+        """
+        Add several simple reception systems in one transaction (requires login)
+
+        Parameters
+        ----------
+        rows : list of tuple
+            One tuple per system with all arguments of add_reception_simple,
+            in order (name, gt_value, ..., description, is_shared)
+
+        Returns
+        -------
+        list of int
+            IDs of the new reception systems, in the order of ``rows``
+        """
+        if not self.current_user_id:
+            raise PermissionError("Login required to add reception system")
+
+        return self._insert_bulk('reception_simple', """
+            INSERT INTO reception_simple
+            (name, gt_value, depoint_loss, frequency,
+             measurement_method, manufacturer, model, description, is_shared, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def _insert_bulk(self, table: str, insert_sql: str, rows: List[tuple]) -> List[int]:
+        """
+        Insert rows owned by the current user with one executemany, return their IDs
+
+        ``insert_sql`` takes the row values followed by user_id. The write lock
+        is held from before the first insert until the commit, so the new
+        rows are exactly those above the previous maximum id.
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            last_id = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+            cursor.executemany(insert_sql, [(*row, self.current_user_id) for row in rows])
+            cursor.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+            ids = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+
+        self.bump_version(table)
+        return ids
+
+    # Columns that may be requested from list_reception_*(columns=...)
+    RECEPTION_COMPLEX_COLUMNS = ('id', 'name', 'ground_station_id', 'ant_size', 'ant_eff',
+                                 'lnb_gain', 'lnb_temp', 'coupling_loss', 'cable_loss',
+                                 'polarization_loss', 'max_depoint', 'manufacturer', 'model',
+                                 'description', 'calculated_gt', 'user_id', 'is_shared',
+                                 'created_at', 'updated_at')
+    RECEPTION_SIMPLE_COLUMNS = ('id', 'name', 'ground_station_id', 'gt_value', 'depoint_loss',
+                                'frequency', 'measurement_method', 'manufacturer', 'model',
+                                'description', 'user_id', 'is_shared', 'created_at', 'updated_at')
+
+    def list_reception_complex(self, user_id: int = None, include_shared: bool = True,
+                               columns: Optional[List[str]] = None) -> List[Union[Dict, sqlite3.Row]]:
         """
         List complex reception systems
 
@@ -910,47 +1814,20 @@ class SatLinkDatabaseUser:
             User ID to filter by
         include_shared : bool
             Whether to include shared items
+        columns : list of str, optional
+            Select only these columns. The rows are then returned as
+            ``sqlite3.Row`` tuples in this column order, without the owner join
 
         Returns
         -------
         list
             List of complex reception systems
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            if user_id is None:
-                user_id = self.current_user_id
-
-            if user_id and include_shared:
-                cursor.execute("""
-                    SELECT rc.*, u.username as owner
-                    FROM reception_complex rc
-                    JOIN users u ON rc.user_id = u.id
-                    WHERE rc.user_id = ? OR rc.is_shared = 1
-                    ORDER BY rc.name
-                """, (user_id,))
-            elif user_id:
-                cursor.execute("""
-                    SELECT rc.*, u.username as owner
-                    FROM reception_complex rc
-                    JOIN users u ON rc.user_id = u.id
-                    WHERE rc.user_id = ?
-                    ORDER BY rc.name
-                """, (user_id,))
-            else:
-                cursor.execute("""
-                    SELECT rc.*, u.username as owner
-                    FROM reception_complex rc
-                    JOIN users u ON rc.user_id = u.id
-                    WHERE rc.is_shared = 1
-                    ORDER BY rc.name
-                """)
-
-            return [dict(row) for row in cursor.fetchall()]
+        return self._list_reception('reception_complex', self.RECEPTION_COMPLEX_COLUMNS,
+                                    user_id, include_shared, columns)
 
-    def list_reception_simple(self, user_id: int = None, include_shared: bool = True) -> List[Dict]:
+    def list_reception_simple(self, user_id: int = None, include_shared: bool = True,
+                              columns: Optional[List[str]] = None) -> List[Union[Dict, sqlite3.Row]]:
         """
         List simple reception systems
 
@@ -960,46 +1837,121 @@ class SatLinkDatabaseUser:
             User ID to filter by
         include_shared : bool
             Whether to include shared items
+        columns : list of str, optional
+            Select only these columns. The rows are then returned as
+            ``sqlite3.Row`` tuples in this column order, without the owner join
 
         Returns
         -------
         list
             List of simple reception systems
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        return self._list_reception('reception_simple', self.RECEPTION_SIMPLE_COLUMNS,
+                                    user_id, include_shared, columns)
+
+    def _list_reception(self, table: str, allowed_columns: tuple, user_id: Optional[int],
+                        include_shared: bool,
+                        columns: Optional[List[str]]) -> List[Union[Dict, sqlite3.Row]]:
+        """List one reception table with the visibility filter in the WHERE clause"""
+        if columns:
+            unknown = set(columns) - set(allowed_columns)
+            if unknown:
+                raise ValueError(f"Unknown {table} columns: {sorted(unknown)}")
 
-            if user_id is None:
-                user_id = self.current_user_id
+        if user_id is None:
+            user_id = self.current_user_id
 
-            if user_id and include_shared:
-                cursor.execute("""
-                    SELECT rs.*, u.username as owner
-                    FROM reception_simple rs
-                    JOIN users u ON rs.user_id = u.id
-                    WHERE rs.user_id = ? OR rs.is_shared = 1
-                    ORDER BY rs.name
-                """, (user_id,))
-            elif user_id:
-                cursor.execute("""
-                    SELECT rs.*, u.username as owner
-                    FROM reception_simple rs
-                    JOIN users u ON rs.user_id = u.id
-                    WHERE rs.user_id = ?
-                    ORDER BY rs.name
-                """, (user_id,))
-            else:
-                cursor.execute("""
-                    SELECT rs.*, u.username as owner
-                    FROM reception_simple rs
-                    JOIN users u ON rs.user_id = u.id
-                    WHERE rs.is_shared = 1
-                    ORDER BY rs.name
-                """)
+        if user_id and include_shared:
+            condition, params = "r.user_id = ? OR r.is_shared = 1", (user_id,)
+        elif user_id:
+            condition, params = "r.user_id = ?", (user_id,)
+        else:
+            condition, params = "r.is_shared = 1", ()
+
+        if columns:
+            select = ', '.join(f'r.{col}' for col in columns)
+            source = f'{table} r'
+        else:
+            select = 'r.*, u.username as owner'
+            source = f'{table} r JOIN users u ON r.user_id = u.id'
+
+        with self._conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {select} FROM {source} WHERE {condition} ORDER BY r.name", params)
 
+            if columns:
+                return cursor.fetchall()
             return [dict(row) for row in cursor.fetchall()]
 
+    def list_user_reception_systems(self, user_id: int = None) -> Dict[str, List[sqlite3.Row]]:
+        """
+        List the complex and simple reception systems a user owns in one query
+
+        Parameters
+        ----------
+        user_id : int, optional
+            Owner (default: current user)
+
+        Returns
+        -------
+        dict
+            ``{'complex': [...], 'simple': [...]}``, each sorted by name. The
+            rows are ``sqlite3.Row`` objects with the columns of both tables;
+            those of the other kind are None
+        """
+        if user_id is None:
+            user_id = self.current_user_id
+
+        systems = {'complex': [], 'simple': []}
+        with self._conn() as conn:
+            for row in conn.execute(SELECT_USER_RECEPTION_SYSTEMS, (user_id, user_id)):
+                systems[row['kind']].append(row)
+        return systems
+
+    def get_reception_complex(self, rc_id: int) -> Optional[Dict]:
+        """
+        Get a single complex reception system by ID
+
+        Parameters
+        ----------
+        rc_id : int
+            Reception system ID
+
+        Returns
+        -------
+        dict or None
+            Reception system, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_RECEPTION_COMPLEX, (rc_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_reception_simple(self, rs_id: int) -> Optional[Dict]:
+        """
+        Get a single simple reception system by ID
+
+        Parameters
+        ----------
+        rs_id : int
+            Reception system ID
+
+        Returns
+        -------
+        dict or None
+            Reception system, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_RECEPTION_SIMPLE, (rs_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def update_reception_complex(self, rc_id: int, **kwargs) -> bool:
         """
         Update complex reception system
@@ -1018,7 +1970,7 @@ class SatLinkDatabaseUser:
         bool
             True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             allowed_fields = ['name', 'ant_size', 'ant_eff',
@@ -1041,6 +1993,7 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
             conn.commit()
+            self.bump_version('reception_complex')
             return cursor.rowcount > 0
 
     def update_reception_simple(self, rs_id: int, **kwargs) -> bool:
@@ -1060,7 +2013,7 @@ class SatLinkDatabaseUser:
         bool
             True if successful
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             allowed_fields = ['name', 'gt_value', 'depoint_loss',
@@ -1082,6 +2035,7 @@ class SatLinkDatabaseUser:
 
             cursor.execute(query, params)
             conn.commit()
+            self.bump_version('reception_simple')
             return cursor.rowcount > 0
 
     def make_reception_complex_public(self, rc_id: int) -> bool:
@@ -1100,10 +2054,43 @@ class SatLinkDatabaseUser:
         """Make simple reception system private"""
         return self.update_reception_simple(rs_id, is_shared=False)
 
+    def toggle_reception_complex_share(self, rc_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a complex reception system (requires ownership)
+
+        Parameters
+        ----------
+        rc_id : int
+            Reception system ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the system does not exist or is
+            owned by another user
+        """
+        return self._toggle_share('reception_complex', rc_id)
+
+    def toggle_reception_simple_share(self, rs_id: int) -> Optional[bool]:
+        """
+        Flip the sharing status of a simple reception system (requires ownership)
+
+        Parameters
+        ----------
+        rs_id : int
+            Reception system ID
+
+        Returns
+        -------
+        bool or None
+            New sharing status, or None if the system does not exist or is
+            owned by another user
+        """
+        return self._toggle_share('reception_simple', rs_id)
+
     def get_public_reception_complex(self) -> List[Dict]:
         """Get all publicly available complex reception systems"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT rc.*, u.username as owner
@@ -1116,8 +2103,7 @@ class SatLinkDatabaseUser:
 
     def get_public_reception_simple(self) -> List[Dict]:
         """Get all publicly available simple reception systems"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT rs.*, u.username as owner
@@ -1173,7 +2159,7 @@ class SatLinkDatabaseUser:
         if not self.current_user_id:
             raise PermissionError("Login required to add link calculation")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO link_calculations
@@ -1194,6 +2180,7 @@ class SatLinkDatabaseUser:
                   results.get('link_margin'), results.get('availability'),
                   results.get('gt_value'), results.get('notes')))
             conn.commit()
+            self.bump_version('link_calculations')
             return cursor.lastrowid
 
     def list_link_calculations(self, user_id: int = None,
@@ -1213,8 +2200,7 @@ class SatLinkDatabaseUser:
         list
             List of link calculations
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             if user_id is None:
@@ -1252,29 +2238,183 @@ class SatLinkDatabaseUser:
 
             return calculations
 
+    def get_link_calculation(self, calc_id: int) -> Optional[Dict]:
+        """
+        Get a single link calculation by ID
+
+        Parameters
+        ----------
+        calc_id : int
+            Link calculation ID
+
+        Returns
+        -------
+        dict or None
+            Link calculation, or None if it does not exist
+        """
+        with self._conn() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(SELECT_LINK_CALCULATION, (calc_id,))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def make_link_public(self, calc_id: int) -> bool:
         """Make link calculation public"""
-        if not self.current_user_id:
-            raise PermissionError("Login required")
+        if not self.make_link_public_if_owner(calc_id):
+            raise PermissionError("Only owner can share calculation")
+        return True
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def make_link_public_if_owner(self, calc_id: int, user_id: int = None) -> bool:
+        """
+        Make a link calculation public, in one UPDATE filtered on its owner
 
-            # Check ownership
-            cursor.execute("""
-                SELECT user_id FROM link_calculations WHERE id = ?
-            """, (calc_id,))
-            result = cursor.fetchone()
-            if not result or result[0] != self.current_user_id:
-                raise PermissionError("Only owner can share calculation")
+        Parameters
+        ----------
+        calc_id : int
+            Calculation ID
+        user_id : int, optional
+            Owner (default: current user)
 
-            cursor.execute("""
+        Returns
+        -------
+        bool
+            False if the calculation does not exist or is owned by another user
+        """
+        if user_id is None:
+            user_id = self.current_user_id
+        if not user_id:
+            raise PermissionError("Login required")
+
+        with self._conn() as conn:
+            cursor = conn.execute("""
                 UPDATE link_calculations
                 SET is_shared = 1
-                WHERE id = ?
-            """, (calc_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+                WHERE id = ? AND user_id = ?
+            """, (calc_id, user_id))
+
+        if cursor.rowcount == 0:
+            return False
+        self.bump_version('link_calculations')
+        return True
+
+    # =========================================================================
+    # Idempotency Keys
+    # =========================================================================
+
+    def reserve_idempotency_key(self, key: str, ttl_seconds: int = 60) -> bool:
+        """
+        Claim an idempotency key before running the request it belongs to
+
+        The key is inserted with status code 0 (in progress) unless it
+        already exists, so of two concurrent requests with the same key
+        only one gets to run. Expired keys of the current user are purged
+        in the same transaction. The reservation itself expires quickly, so
+        a request that died before storing its response (e.g. on a restart)
+        can be retried; store_idempotent_response() extends it.
+
+        Parameters
+        ----------
+        key : str
+            Idempotency key, scoped by the caller (e.g. with the request path)
+        ttl_seconds : int
+            How long the reservation blocks retries while in progress
+
+        Returns
+        -------
+        bool
+            True if the key was reserved, False if it is already taken
+        """
+        if not self.current_user_id:
+            raise PermissionError("Login required")
+
+        with self._conn() as conn:
+            conn.execute("""
+                DELETE FROM idempotency_keys
+                WHERE user_id = ? AND expires_at <= CURRENT_TIMESTAMP
+            """, (self.current_user_id,))
+            cursor = conn.execute("""
+                INSERT INTO idempotency_keys
+                (user_id, key, response_json, status_code, expires_at)
+                VALUES (?, ?, '', 0, datetime('now', ?))
+                ON CONFLICT (user_id, key) DO NOTHING
+            """, (self.current_user_id, key, f'+{int(ttl_seconds)} seconds'))
+            return cursor.rowcount == 1
+
+    def release_idempotency_key(self, key: str):
+        """
+        Drop a reserved key whose request did not produce a response to store
+
+        Keys that already hold a response are left alone.
+
+        Parameters
+        ----------
+        key : str
+            Idempotency key, as passed to reserve_idempotency_key()
+        """
+        if not self.current_user_id:
+            return
+
+        with self._conn() as conn:
+            conn.execute("""
+                DELETE FROM idempotency_keys
+                WHERE user_id = ? AND key = ? AND status_code = 0
+            """, (self.current_user_id, key))
+
+    def get_idempotent_response(self, key: str) -> Optional[Tuple[str, int]]:
+        """
+        Get the stored response of a request the current user already made
+
+        Parameters
+        ----------
+        key : str
+            Idempotency key, as passed to reserve_idempotency_key()
+
+        Returns
+        -------
+        tuple or None
+            ``(response_json, status_code)``, or None if the key is unknown,
+            has expired or its request is still in progress
+        """
+        if not self.current_user_id:
+            return None
+
+        with self._conn() as conn:
+            row = conn.execute("""
+                SELECT response_json, status_code FROM idempotency_keys
+                WHERE user_id = ? AND key = ? AND status_code > 0
+                  AND expires_at > CURRENT_TIMESTAMP
+            """, (self.current_user_id, key)).fetchone()
+
+        return (row[0], row[1]) if row else None
+
+    def store_idempotent_response(self, key: str, response_json: str, status_code: int,
+                                  ttl_seconds: int = 86400):
+        """
+        Store the response of a request so retries with the same key replay it
+
+        Parameters
+        ----------
+        key : str
+            Idempotency key, as passed to reserve_idempotency_key()
+        response_json : str
+            Serialized response body
+        status_code : int
+            HTTP status of the response
+        ttl_seconds : int
+            How long the response is replayed
+        """
+        if not self.current_user_id:
+            raise PermissionError("Login required")
+
+        with self._conn() as conn:
+            conn.execute("""
+                UPDATE idempotency_keys
+                SET response_json = ?, status_code = ?, expires_at = datetime('now', ?)
+                WHERE user_id = ? AND key = ?
+            """, (response_json, status_code, f'+{int(ttl_seconds)} seconds',
+                  self.current_user_id, key))
 
     # =========================================================================
     # Public Access Methods
@@ -1282,8 +2422,7 @@ class SatLinkDatabaseUser:
 
     def get_public_satellites(self) -> List[Dict]:
         """Get all publicly available satellites"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT sp.*, u.username as owner
@@ -1296,8 +2435,7 @@ class SatLinkDatabaseUser:
 
     def get_public_transponders(self, satellite_id: int = None) -> List[Dict]:
         """Get all publicly available transponders"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             query = """
@@ -1320,8 +2458,7 @@ class SatLinkDatabaseUser:
 
     def get_public_carriers(self) -> List[Dict]:
         """Get all publicly available carriers"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT c.*, u.username as owner
@@ -1334,8 +2471,7 @@ class SatLinkDatabaseUser:
 
     def get_public_ground_stations(self, country: str = None) -> List[Dict]:
         """Get all publicly available ground stations"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             query = """
@@ -1357,8 +2493,7 @@ class SatLinkDatabaseUser:
 
     def get_public_link_calculations(self) -> List[Dict]:
         """Get all publicly available link calculations"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT lc.*, u.username as owner
@@ -1394,7 +2529,7 @@ class SatLinkDatabaseUser:
         if not user_id:
             raise PermissionError("Login required")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.cursor()
 
             stats = {}
@@ -1440,8 +2575,20 @@ class SatLinkDatabaseUser:
             return stats
 
     def close(self):
-        """Close database connection"""
+        """
+        Close the database connections
+
+        Waits for pending gather() calls, stops the worker threads and closes
+        every thread's connection, the workers' included. The object cannot
+        be used afterwards.
+        """
         self.logout()
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
 
 
 # Test the updated database manager
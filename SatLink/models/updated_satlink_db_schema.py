@@ -15,6 +15,7 @@ UPDATED_SQL_SCHEMA = """
 -- ============================================================================
 
 -- Drop existing tables
+DROP TABLE IF EXISTS idempotency_keys;
 DROP TABLE IF EXISTS link_calculations;
 DROP TABLE IF EXISTS reception_simple;
 DROP TABLE IF EXISTS reception_complex;
@@ -255,6 +256,20 @@ CREATE TABLE link_calculations (
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- ============================================================================
+-- Table: idempotency_keys
+-- 存储带 Idempotency-Key 的请求响应，重试时直接返回
+-- ============================================================================
+CREATE TABLE idempotency_keys (
+    user_id INTEGER NOT NULL,
+    key TEXT NOT NULL,                    -- Request path + Idempotency-Key header
+    response_json TEXT NOT NULL,
+    status_code INTEGER NOT NULL,         -- 0 while the request is in progress
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, key),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+) WITHOUT ROWID;
+
 -- ============================================================================
 -- INDEXES for better query performance
 -- ============================================================================
@@ -273,7 +288,8 @@ CREATE INDEX idx_satellite_orbit ON satellite_positions(orbit_type);
 CREATE INDEX idx_satellite_shared ON satellite_positions(is_shared);
 
 CREATE INDEX idx_transponder_user ON transponders(user_id);
-CREATE INDEX idx_transponder_sat ON transponders(satellite_id);
+-- (satellite_id, name) also serves the per-satellite lists' ORDER BY name
+CREATE INDEX idx_transponder_sat_name ON transponders(satellite_id, name);
 CREATE INDEX idx_transponder_freq ON transponders(freq);
 CREATE INDEX idx_transponder_shared ON transponders(is_shared);
 
@@ -284,6 +300,7 @@ CREATE INDEX idx_carrier_shared ON carriers(is_shared);
 CREATE INDEX idx_ground_station_user ON ground_stations(user_id);
 CREATE INDEX idx_ground_station_location ON ground_stations(site_lat, site_long);
 CREATE INDEX idx_ground_station_shared ON ground_stations(is_shared);
+CREATE INDEX idx_ground_station_user_country ON ground_stations(user_id, country);
 
 CREATE INDEX idx_reception_complex_user ON reception_complex(user_id);
 CREATE INDEX idx_reception_complex_gs ON reception_complex(ground_station_id);
@@ -299,6 +316,21 @@ CREATE INDEX idx_link_calc_gs ON link_calculations(ground_station_id);
 CREATE INDEX idx_link_calc_shared ON link_calculations(is_shared);
 CREATE INDEX idx_link_calc_date ON link_calculations(calculation_date);
 
+CREATE INDEX idx_idempotency_expires ON idempotency_keys(expires_at);
+
+-- ============================================================================
+-- TRIGGERS
+-- ============================================================================
+
+-- Deleting a ground station removes its reception systems in the same
+-- statement (foreign_keys stays off, so ON DELETE CASCADE is not an option)
+CREATE TRIGGER IF NOT EXISTS trg_ground_station_delete
+AFTER DELETE ON ground_stations
+BEGIN
+    DELETE FROM reception_complex WHERE ground_station_id = OLD.id;
+    DELETE FROM reception_simple WHERE ground_station_id = OLD.id;
+END;
+
 -- ============================================================================
 -- VIEWS for common queries
 -- ============================================================================
@@ -414,3 +446,33 @@ INSERT INTO users (username, email, password_hash, salt, is_active)
 SELECT 'user1', 'user1@example.com', '4e77d97e20d21828f55be60ee31a31550a34f1e959c1e0e4141047945f91788e', 'usersalt12345678', 1
 WHERE NOT EXISTS (SELECT 1 FROM users WHERE username = 'user1');
 """
+
+# ============================================================================
+# TABLES, INDEXES AND TRIGGERS ADDED AFTER THE INITIAL SCHEMA
+# ============================================================================
+
+# Databases created from an older UPDATED_SQL_SCHEMA get these when
+# SatLinkDatabaseUser opens them; on a fresh database they already exist
+UPDATED_SQL_UPGRADES = """
+CREATE INDEX IF NOT EXISTS idx_ground_station_user_country ON ground_stations(user_id, country);
+CREATE INDEX IF NOT EXISTS idx_transponder_sat_name ON transponders(satellite_id, name);
+DROP INDEX IF EXISTS idx_transponder_sat;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    response_json TEXT NOT NULL,
+    status_code INTEGER NOT NULL,         -- 0 while the request is in progress
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_id, key),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency_keys(expires_at);
+
+CREATE TRIGGER IF NOT EXISTS trg_ground_station_delete
+AFTER DELETE ON ground_stations
+BEGIN
+    DELETE FROM reception_complex WHERE ground_station_id = OLD.id;
+    DELETE FROM reception_simple WHERE ground_station_id = OLD.id;
+END;
+"""
@@ -0,0 +1,62 @@
+"""
+Test script for /manage/api/transponders
+Checks the list-of-dicts response shape and the ETag / 304 handling of polls
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the SatLink directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import web_app
+
+
+def login(client, user_id=1, username='admin'):
+    """Log the test client in by writing the session directly"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['username'] = username
+
+
+def test_transponders_api_shape_and_etag():
+    db_path = os.path.join(tempfile.mkdtemp(), 'satlink_test.db')
+    web_app.init_db(db_path)
+    web_app.app.config['TESTING'] = True
+
+    db = web_app.db
+    db.current_user_id = 1
+    sat_id = db.add_satellite_position('Test Sat', -70.0)
+    db.add_transponder('TP1', 12.0, freq_band='Ku', eirp_max=52.0,
+                       polarization='H', satellite_id=sat_id)
+
+    client = web_app.app.test_client()
+    login(client)
+    url = f'/manage/api/transponders?satellite_id={sat_id}'
+
+    first = client.get(url)
+    assert first.status_code == 200
+    transponders = first.get_json()
+    assert isinstance(transponders, list), "expected a list of transponders"
+    assert transponders[0] == {'id': transponders[0]['id'], 'name': 'TP1', 'freq': 12.0,
+                               'freq_band': 'Ku', 'eirp_max': 52.0, 'polarization': 'H'}
+    print("  OK list-of-dicts shape")
+
+    etag = first.headers['ETag']
+    unchanged = client.get(url, headers={'If-None-Match': etag})
+    assert unchanged.status_code == 304, "unchanged poll should get a 304"
+    print("  OK 304 for an unchanged poll")
+
+    db.current_user_id = 1
+    db.add_transponder('TP2', 11.0, satellite_id=sat_id)
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200, "poll after a change should get the new body"
+    assert [tp['name'] for tp in changed.get_json()] == ['TP1', 'TP2']
+    print("  OK new body after a change")
+
+
+if __name__ == '__main__':
+    print("Checking /manage/api/transponders...")
+    test_transponders_api_shape_and_etag()
+    print("All checks passed")
@@ -0,0 +1,63 @@
+"""
+Test script for the cached management pages
+Checks that a flashed message is shown once and not replayed from the page cache
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the SatLink directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import web_app
+
+
+def login(client, user_id=1, username='admin'):
+    """Log the test client in by writing the session directly"""
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['username'] = username
+
+
+def flash_message(client, message):
+    """Queue a flashed message, as a redirecting POST handler would"""
+    with client.session_transaction() as sess:
+        sess.setdefault('_flashes', []).append(('success', message))
+
+
+def check_flash_not_replayed(client, url):
+    """Load ``url`` twice after a flash; only the first response may show it"""
+    message = 'Cached flash check'
+
+    # Prime the cache without a flash
+    client.get(url)
+
+    flash_message(client, message)
+    first = client.get(url)
+    second = client.get(url)
+
+    assert message in first.get_data(as_text=True), f"{url}: flash missing on first load"
+    assert message not in second.get_data(as_text=True), f"{url}: flash replayed on second load"
+    print(f"  OK {url}")
+
+
+def test_cached_pages_do_not_replay_flashes():
+    db_path = os.path.join(tempfile.mkdtemp(), 'satlink_test.db')
+    web_app.init_db(db_path)
+    web_app.app.config['TESTING'] = True
+
+    client = web_app.app.test_client()
+    login(client)
+
+    for url in ('/manage/satellites', '/manage/transponders', '/manage/carriers',
+                '/manage/ground_stations', '/manage/satellites/add',
+                '/manage/transponders/add', '/manage/carriers/add',
+                '/manage/ground_stations/add'):
+        check_flash_not_replayed(client, url)
+
+
+if __name__ == '__main__':
+    print("Checking that cached pages do not replay flashed messages...")
+    test_cached_pages_do_not_replay_flashes()
+    print("All checks passed")
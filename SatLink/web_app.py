@@ -6,14 +6,19 @@ Flask web application for satellite link calculations with user authentication.
 
 import os
 import json
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response, g
 from flask_bcrypt import Bcrypt
-from functools import wraps
+from jinja2 import FileSystemBytecodeCache
+from functools import wraps, lru_cache
+from contextlib import ExitStack
 import datetime
+import gzip
+import hashlib
 import sqlite3
 import numpy as np
 import logging
 import traceback
+from urllib.parse import urlencode
 
 # Import our modules
 from models.updated_db_manager import SatLinkDatabaseUser
@@ -31,6 +36,13 @@ user_management_bp.db = None  # Will be set after db is initialized
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 bcrypt = Bcrypt(app)
+# Per-request query budget check (see check_query_budget): None turns it on
+# only in debug and testing, True/False force it
+app.config.setdefault('QUERY_BUDGET', None)
+
+# Keep compiled templates on disk so a restarted worker skips parsing and
+# compiling them again (defaults to a per-user directory under /tmp)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(os.environ.get('JINJA_CACHE_DIR'))
 
 # Configure logging to include timestamps and level
 logging.basicConfig(
@@ -45,11 +57,90 @@ logging.basicConfig(
 # Global database instance
 db = None
 
+# Responses worth compressing: text-like types above a size where gzip pays off
+COMPRESSIBLE_MIMETYPES = {'text/html', 'text/css', 'text/plain', 'application/json',
+                          'application/javascript'}
+COMPRESS_MIN_SIZE = 512
+
+# Server worker threads; the database's gather() pool is sized to match
+SERVER_THREADS = int(os.environ.get('SATLINK_THREADS', 8))
+
+# Statements one request may run against the same table before it is reported
+# as a likely N+1 / scan-for-one-row pattern
+QUERY_BUDGET_PER_TABLE = 3
+
+
+@app.after_request
+def compress_response(response):
+    """Gzip text responses for clients that accept it"""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    # The encoded bytes differ from what the ETag was computed on
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+@app.before_request
+def set_current_user():
+    """Act for this request's user only
+
+    The database's current user is kept per thread, and server threads are
+    reused across requests, so it is reset from the session every time:
+    a request never sees the user of one served earlier on its thread.
+    """
+    if db is not None:
+        db.current_user_id = session.get('user_id')
+
+
+@app.before_request
+def start_query_trace():
+    """Count the database statements of this request, see check_query_budget"""
+    enabled = app.config['QUERY_BUDGET']
+    if enabled is None:
+        enabled = app.debug or app.testing
+    if db is None or not enabled:
+        return
+    g.query_trace = ExitStack()
+    g.query_counts = g.query_trace.enter_context(db.trace_queries())
+
+
+@app.teardown_request
+def check_query_budget(exc):
+    """Report tables queried more often than QUERY_BUDGET_PER_TABLE in one request
+
+    Runs on teardown so the trace is closed even when the view raised.
+    """
+    trace = g.pop('query_trace', None)
+    if trace is None:
+        return
+    trace.close()
+
+    over_budget = {table: count for table, count in g.query_counts.items()
+                   if count > QUERY_BUDGET_PER_TABLE}
+    if over_budget:
+        logging.warning(f"{request.method} {request.path} queried {over_budget} "
+                        f"(budget {QUERY_BUDGET_PER_TABLE} per table)")
+
 
 def init_db(db_path='satlink.db'):
     """Initialize database with schema"""
     global db
-    db = SatLinkDatabaseUser(db_path)
+    db = SatLinkDatabaseUser(db_path, gather_workers=SERVER_THREADS)
 
     # Make db available to user management blueprint
     user_management_bp.db = db
@@ -58,8 +149,9 @@ def init_db(db_path='satlink.db'):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Check if users table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+    # Check if the schema exists. Not the users table: UserAuth creates that
+    # one on its own when SatLinkDatabaseUser is constructed.
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='link_calculations'")
     if cursor.fetchone() is None:
         # Database is empty, create all tables
         cursor.executescript(UPDATED_SQL_SCHEMA)
@@ -187,13 +279,18 @@ def dashboard():
     user_info = db.get_current_user_info()
     stats = db.get_user_statistics()
 
-    # Get recent calculations
-    calculations = db.list_link_calculations()[:5]
-
-    # Get reception systems and ground stations
-    reception_simple = db.list_reception_simple(user_id=db.current_user_id, include_shared=False)
-    reception_complex = db.list_reception_complex(user_id=db.current_user_id, include_shared=False)
-    ground_stations = db.list_ground_stations(user_id=db.current_user_id, include_shared=False)
+    # Get recent calculations, reception systems and ground stations; the
+    # queries are independent, so they run side by side. The reception cards
+    # only show a few fields, so only those are selected
+    calculations, reception_simple, reception_complex, ground_stations = db.gather(
+        lambda: db.list_link_calculations()[:5],
+        lambda: db.list_reception_simple(user_id=db.current_user_id, include_shared=False,
+                                         columns=('name', 'gt_value', 'frequency')),
+        lambda: db.list_reception_complex(user_id=db.current_user_id, include_shared=False,
+                                          columns=('name', 'ant_size', 'calculated_gt')),
+        lambda: db.list_ground_stations(user_id=db.current_user_id, include_shared=False,
+                                        as_rows=True)
+    )
 
     return render_template('dashboard.html',
                          user_info=user_info,
@@ -208,11 +305,16 @@ def dashboard():
 @login_required
 def calculate():
     """Link calculation page"""
-    # Get all available components
-    satellites = db.list_satellite_positions()
-    transponders = db.list_transponders()
-    carriers = db.list_carriers()
-    ground_stations = db.list_ground_stations()
+    # Get all available components, running the independent queries side by side
+    (satellites, transponders, carriers, ground_stations,
+     reception_simple, reception_complex) = db.gather(
+        db.list_satellite_positions,
+        lambda: db.list_transponders(as_rows=True),
+        lambda: db.list_carriers(as_rows=True),
+        lambda: db.list_ground_stations(as_rows=True),
+        db.list_reception_simple,
+        db.list_reception_complex
+    )
 
     # Group transponders by satellite
     transponders_by_sat = {}
@@ -222,17 +324,31 @@ def calculate():
             transponders_by_sat[sat_id] = []
         transponders_by_sat[sat_id].append(tp)
 
-    # Get reception systems
-    reception_simple = db.get_reception_simple_list()
-    reception_complex = db.get_reception_complex_list()
+    # Preselect the previous calculation's satellite and reception type; the
+    # page then loads both dropdowns from /api/bootstrap, so hint the browser
+    # (or an HTTP/2 proxy) to fetch that exact URL while the HTML is parsed
+    last_selection = session.get('last_selection')
+    if last_selection and (last_selection.get('reception_type') not in ('complex', 'simple') or
+                           not any(sat['id'] == last_selection.get('satellite_id') for sat in satellites)):
+        last_selection = None
 
-    return render_template('calculate.html',
+    response = make_response(render_template('calculate.html',
                          satellites=satellites,
                          transponders_by_sat=transponders_by_sat,
                          carriers=carriers,
                          ground_stations=ground_stations,
                          reception_simple=reception_simple,
-                         reception_complex=reception_complex)
+                         reception_complex=reception_complex,
+                         last_selection=last_selection))
+    if last_selection:
+        # Same parameter order as the page's URLSearchParams, so the preloaded
+        # response is the one the script's fetch() picks up
+        bootstrap_url = url_for('api_bootstrap') + '?' + urlencode({
+            'satellite_id': last_selection['satellite_id'],
+            'reception_type': last_selection['reception_type'],
+        })
+        response.headers['Link'] = f'<{bootstrap_url}>; rel=preload; as=fetch; crossorigin'
+    return response
 
 
 @app.route('/api/calculate_link', methods=['POST'])
@@ -260,10 +376,12 @@ def api_calculate_link():
         reception_type = data.get('reception_type')
         reception_id = _to_int(data.get('reception_id'))
 
+        # Remembered for preloading the dropdowns on the next visit to /calculate
+        session['last_selection'] = {'satellite_id': satellite_id, 'reception_type': reception_type}
+
         # Load components from database
         sat = None
-        satellites = db.list_satellite_positions()
-        if not satellites:
+        if not db.count_satellite_positions():
             # Add default satellite if none exist
             # Use system user ID (1) for default satellite
             temp_user_id = db.current_user_id or 1
@@ -276,68 +394,61 @@ def api_calculate_link():
                 is_shared=True
             )
             db.current_user_id = None  # Reset user ID
-            satellites = db.list_satellite_positions()
 
-        for s in satellites:
-            if s['id'] == satellite_id:
-                sat = SatellitePosition(s['sat_long'], s['sat_lat'], s['h_sat'])
-                sat.name = s['name']
-                logging.info(f"Found satellite: {sat.name}")
-                break
+        s = _visible(db.get_satellite_position(satellite_id)) if satellite_id else None
+        if s:
+            sat = SatellitePosition(s['sat_long'], s['sat_lat'], s['h_sat'])
+            sat.name = s['name']
+            logging.info(f"Found satellite: {sat.name}")
 
         tp = None
-        for t in db.list_transponders():
-            if t['id'] == transponder_id:
-                tp = Transponder(t['freq'], t['eirp_max'], t['b_transp'],
-                              t['back_off'], t['contorno'])
-                tp.name = t['name']
-                tp.polarization = t.get('polarization')
-                logging.info(f"Found transponder: {tp.name}")
-                break
+        t = _visible(db.get_transponder(transponder_id)) if transponder_id else None
+        if t:
+            tp = Transponder(t['freq'], t['eirp_max'], t['b_transp'],
+                          t['back_off'], t['contorno'])
+            tp.name = t['name']
+            tp.polarization = t.get('polarization')
+            logging.info(f"Found transponder: {tp.name}")
 
         car = None
-        for c in db.list_carriers():
-            if c['id'] == carrier_id:
-                car = Carrier(c['modulation'], c['roll_off'], c['fec'], c['b_util'])
-                car.name = c['name']
-                car.modcod = c['modcod']
-                car.standard = c.get('standard')
-                logging.info(f"Found carrier: {car.name}")
-                break
+        c = _visible(db.get_carrier(carrier_id)) if carrier_id else None
+        if c:
+            car = Carrier(c['modulation'], c['roll_off'], c['fec'], c['b_util'])
+            car.name = c['name']
+            car.modcod = c['modcod']
+            car.standard = c.get('standard')
+            logging.info(f"Found carrier: {car.name}")
 
         gs = None
-        for g in db.list_ground_stations():
-            if g['id'] == ground_station_id:
-                gs = {'site_lat': g['site_lat'], 'site_long': g['site_long']}
-                gs['name'] = g['name']
-                gs['altitude'] = g.get('altitude', 0)
-                logging.info(f"Found ground station: {gs['name']}")
-                break
+        station = _visible(db.get_ground_station(ground_station_id)) if ground_station_id else None
+        if station:
+            gs = {'site_lat': station['site_lat'], 'site_long': station['site_long']}
+            gs['name'] = station['name']
+            gs['altitude'] = station.get('altitude', 0)
+            logging.info(f"Found ground station: {gs['name']}")
 
         # Load reception system
         reception = None
         if reception_type == 'complex':
-            for r in db.get_reception_complex_list():
-                if r['id'] == reception_id:
-                    reception = {
-                        'ant_size': r['ant_size'],
-                        'ant_eff': r['ant_eff'],
-                        'lnb_gain': r['lnb_gain'],
-                        'lnb_temp': r['lnb_temp'],
-                        'coupling_loss': r.get('coupling_loss', 0),
-                        'cable_loss': r.get('cable_loss', 0),
-                        'polarization_loss': r.get('polarization_loss', 3),
-                        'max_depoint': r.get('max_depoint', 0)
-                    }
-                    break
+            r = _visible(db.get_reception_complex(reception_id)) if reception_id else None
+            if r:
+                reception = {
+                    'ant_size': r['ant_size'],
+                    'ant_eff': r['ant_eff'],
+                    'lnb_gain': r['lnb_gain'],
+                    'lnb_temp': r['lnb_temp'],
+                    'coupling_loss': r.get('coupling_loss', 0),
+                    'cable_loss': r.get('cable_loss', 0),
+                    'polarization_loss': r.get('polarization_loss', 3),
+                    'max_depoint': r.get('max_depoint', 0)
+                }
         else:
-            for r in db.get_reception_simple_list():
-                if r['id'] == reception_id:
-                    reception = {
-                        'gt_value': r['gt_value'],
-                        'depoint_loss': r.get('depoint_loss', 0)
-                    }
-                    break
+            r = _visible(db.get_reception_simple(reception_id)) if reception_id else None
+            if r:
+                reception = {
+                    'gt_value': r['gt_value'],
+                    'depoint_loss': r.get('depoint_loss', 0)
+                }
 
         # Perform link calculation
         try:
@@ -563,11 +674,7 @@ def calculations():
 def calculation_detail(calc_id):
     """View calculation details"""
     # Get calculation from database
-    calc = None
-    for c in db.list_link_calculations():
-        if c['id'] == calc_id:
-            calc = c
-            break
+    calc = _visible(db.get_link_calculation(calc_id))
 
     if not calc:
         flash('Calculation not found.', 'error')
@@ -625,6 +732,89 @@ def manage():
                          reception_complex=reception_complex)
 
 
+TRANSPONDER_OPTION_COLUMNS = ('id', 'name', 'freq', 'eirp_max', 'b_transp')
+RECEPTION_OPTION_COLUMNS = {
+    'complex': ('id', 'name', 'ant_size', 'ant_eff', 'lnb_gain', 'lnb_temp'),
+    'simple': ('id', 'name', 'gt_value'),
+}
+
+
+def _visible(row):
+    """Return ``row`` if the current user owns it or it is shared, otherwise None
+
+    Mirrors the visibility rule of the ``list_*`` queries for rows fetched
+    by id with the ``get_*`` methods.
+    """
+    if row and (row['user_id'] == db.current_user_id or row['is_shared']):
+        return row
+    return None
+
+
+def _columnar(rows, cols):
+    """Pack rows selected as ``cols`` into ``{'cols': [...], 'rows': [[...], ...]}`` so keys are sent once"""
+    return {'cols': list(cols), 'rows': [tuple(row) for row in rows]}
+
+
+def _transponder_options(satellite_id):
+    """Transponders of a satellite, reduced to the fields the calculate page uses"""
+    rows = []
+    if satellite_id:
+        rows = db.list_transponders(satellite_id=satellite_id, columns=TRANSPONDER_OPTION_COLUMNS)
+    return _columnar(rows, TRANSPONDER_OPTION_COLUMNS)
+
+
+def _reception_options(reception_type):
+    """Reception systems of one type, reduced to the fields the calculate page uses"""
+    if reception_type not in RECEPTION_OPTION_COLUMNS:
+        return _columnar([], ('id', 'name'))
+
+    cols = RECEPTION_OPTION_COLUMNS[reception_type]
+    if reception_type == 'complex':
+        rows = db.list_reception_complex(user_id=db.current_user_id, columns=cols)
+    else:
+        rows = db.list_reception_simple(user_id=db.current_user_id, columns=cols)
+    return _columnar(rows, cols)
+
+
+@lru_cache(maxsize=512)
+def _cached_options_json(kind, key, user_id, version, ndjson=False):
+    """Serialized dropdown list, memoized per (kind, key, user, table version, format)
+
+    ``user_id`` and ``version`` are not used in the body; they only make sure
+    an entry is never served to another user or after the table has changed.
+    With ``ndjson`` the body holds the column names on the first line and
+    one JSON array per row on each following line.
+    """
+    if kind == 'transponders':
+        options = _transponder_options(key)
+    else:
+        options = _reception_options(key)
+    if ndjson:
+        return ''.join(json.dumps(line) + '\n' for line in [options['cols'], *options['rows']])
+    return json.dumps(options)
+
+
+def _options_json(kind, key, ndjson=False):
+    """Cached JSON (or NDJSON) body of the transponder or reception-system dropdown"""
+    if kind == 'transponders':
+        version = db.get_version('transponders')
+    elif key in ('complex', 'simple'):
+        version = db.get_version(f'reception_{key}')
+    else:
+        version = 0
+    return _cached_options_json(kind, key, db.current_user_id, version, ndjson)
+
+
+def _json_with_etag(body, mimetype='application/json'):
+    """Return a pre-serialized JSON body, answering 304 when the client's copy is current"""
+    response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(hashlib.blake2b(body.encode(), digest_size=8).hexdigest())
+    # Per-user data: let the browser keep it, but revalidate on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/api/transponders')
 @login_required
 def api_transponders():
@@ -632,23 +822,14 @@ def api_transponders():
     try:
         satellite_id = request.args.get('satellite_id', type=int)
 
-        if satellite_id:
-            # Get transponders for the specific satellite
-            transponders = db.list_transponders(satellite_id=satellite_id)
-
-            # Format the response to only include needed fields
-            formatted_transponders = []
-            for tp in transponders:
-                formatted_transponders.append({
-                    'id': tp['id'],
-                    'name': tp['name'],
-                    'freq': tp['freq'],
-                    'eirp_max': tp['eirp_max'],
-                    'b_transp': tp['b_transp']
-                })
-            return jsonify(formatted_transponders)
-        else:
-            return jsonify([])
+        if request.args.get('format') == 'ndjson':
+            # Column names on the first line, then one JSON array per row, so
+            # the client can add options while the rest is still arriving.
+            # Cached and revalidated like the JSON body.
+            return _json_with_etag(_options_json('transponders', satellite_id, ndjson=True),
+                                   mimetype='application/x-ndjson')
+
+        return _json_with_etag(_options_json('transponders', satellite_id))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -660,30 +841,41 @@ def api_reception_systems():
     """API endpoint to get reception systems by type"""
     try:
         reception_type = request.args.get('type')
+        return _json_with_etag(_options_json('reception_systems', reception_type))
 
-        if reception_type == 'complex':
-            systems = []
-            for rs in db.get_reception_complex_list():
-                systems.append({
-                    'id': rs['id'],
-                    'name': rs['name'],
-                    'ant_size': rs['ant_size'],
-                    'ant_eff': rs['ant_eff'],
-                    'lnb_gain': rs['lnb_gain'],
-                    'lnb_temp': rs['lnb_temp']
-                })
-        elif reception_type == 'simple':
-            systems = []
-            for rs in db.get_reception_simple_list():
-                systems.append({
-                    'id': rs['id'],
-                    'name': rs['name'],
-                    'gt_value': rs['gt_value']
-                })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/bootstrap', methods=['GET', 'POST'])
+@login_required
+def api_bootstrap():
+    """API endpoint returning the calculate page's dependent dropdowns in one round trip
+
+    Accepts ``satellite_id`` and ``reception_type`` (query string, or JSON body
+    for POST); either may be omitted, in which case the corresponding list is
+    returned empty.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
         else:
-            systems = []
+            data = request.args
+
+        # A string from the query string, or any JSON value from the body
+        satellite_id = data.get('satellite_id')
+        if satellite_id in (None, ''):
+            satellite_id = None
+        elif isinstance(satellite_id, bool) or not str(satellite_id).isdigit():
+            return jsonify({'error': 'satellite_id must be an integer'}), 400
+        else:
+            satellite_id = int(satellite_id)
 
-        return jsonify(systems)
+        body = '{"transponders": %s, "reception_systems": %s}' % (
+            _options_json('transponders', satellite_id),
+            _options_json('reception_systems', data.get('reception_type'))
+        )
+        return _json_with_etag(body)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -694,8 +886,7 @@ def api_reception_systems():
 def api_satellite_detail(id):
     """API endpoint to get satellite details"""
     try:
-        satellites = db.list_satellite_positions()
-        sat = next((s for s in satellites if s['id'] == id), None)
+        sat = _visible(db.get_satellite_position(id))
         if sat:
             return jsonify({
                 'id': sat['id'],
@@ -715,8 +906,7 @@ def api_satellite_detail(id):
 def api_transponder_detail(id):
     """API endpoint to get transponder details"""
     try:
-        transponders = db.list_transponders()
-        tp = next((t for t in transponders if t['id'] == id), None)
+        tp = _visible(db.get_transponder(id))
         if tp:
             return jsonify({
                 'id': tp['id'],
@@ -739,8 +929,7 @@ def api_transponder_detail(id):
 def api_carrier_detail(id):
     """API endpoint to get carrier details"""
     try:
-        carriers = db.list_carriers()
-        car = next((c for c in carriers if c['id'] == id), None)
+        car = _visible(db.get_carrier(id))
         if car:
             return jsonify({
                 'id': car['id'],
@@ -761,8 +950,7 @@ def api_carrier_detail(id):
 def api_ground_station_detail(id):
     """API endpoint to get ground station details"""
     try:
-        ground_stations = db.list_ground_stations()
-        gs = next((g for g in ground_stations if g['id'] == id), None)
+        gs = _visible(db.get_ground_station(id))
         if gs:
             return jsonify({
                 'id': gs['id'],
@@ -784,8 +972,7 @@ def api_ground_station_detail(id):
 def api_reception_complex_detail(id):
     """API endpoint to get complex reception system details"""
     try:
-        systems = db.list_reception_complex()
-        rec = next((r for r in systems if r['id'] == id), None)
+        rec = _visible(db.get_reception_complex(id))
         if rec:
             return jsonify({
                 'id': rec['id'],
@@ -809,8 +996,7 @@ def api_reception_complex_detail(id):
 def api_reception_simple_detail(id):
     """API endpoint to get simple reception system details"""
     try:
-        systems = db.list_reception_simple()
-        rec = next((r for r in systems if r['id'] == id), None)
+        rec = _visible(db.get_reception_simple(id))
         if rec:
             return jsonify({
                 'id': rec['id'],
@@ -864,39 +1050,41 @@ def api_add_parameter():
 
         # Insert into appropriate table
         if param_type == 'satellite':
-            db.cursor.execute("""
+            db.execute("""
                 INSERT INTO satellite_positions (name, sat_long, sat_lat, h_sat, user_id, is_shared)
                 VALUES (?, ?, ?, ?, ?, 0)
             """, (param_name, param_data.get('sat_long'), param_data.get('sat_lat'),
                   param_data.get('h_sat'), db.current_user_id))
+            db.bump_version('satellite_positions')
         elif param_type == 'transponder':
             # For transponder, we need a satellite_id - use the first available
-            db.cursor.execute("SELECT id FROM satellite_positions LIMIT 1", ())
-            sat_row = db.cursor.fetchone()
-            if not sat_row:
+            sat_rows = db.execute_read("SELECT id FROM satellite_positions LIMIT 1")
+            if not sat_rows:
                 return jsonify({'success': False, 'message': 'No satellite available for transponder'}), 400
 
-            db.cursor.execute("""
+            db.execute("""
                 INSERT INTO transponders (name, satellite_id, freq, eirp_max, b_transp, polarization, user_id, is_shared)
                 VALUES (?, ?, ?, ?, ?, ?, ?, 0)
-            """, (param_name, sat_row[0], param_data.get('freq'), param_data.get('eirp_max'),
+            """, (param_name, sat_rows[0][0], param_data.get('freq'), param_data.get('eirp_max'),
                   param_data.get('b_transp'), param_data.get('polarization'), db.current_user_id))
+            db.bump_version('transponders')
         elif param_type == 'carrier':
-            db.cursor.execute("""
+            db.execute("""
                 INSERT INTO carriers (name, modulation, roll_off, fec, b_util, user_id, is_shared)
                 VALUES (?, ?, ?, ?, ?, ?, 0)
             """, (param_name, param_data.get('modulation'), param_data.get('roll_off'),
                   param_data.get('fec'), param_data.get('b_util'), db.current_user_id))
+            db.bump_version('carriers')
         elif param_type == 'ground_station':
-            db.cursor.execute("""
+            db.execute("""
                 INSERT INTO ground_stations (name, site_lat, site_long, altitude, user_id, is_shared)
                 VALUES (?, ?, ?, ?, ?, 0)
             """, (param_name, param_data.get('site_lat'), param_data.get('site_long'),
                   param_data.get('altitude'), db.current_user_id))
+            db.bump_version('ground_stations')
         else:
             return jsonify({'success': False, 'message': 'Invalid parameter type'}), 400
 
-        db.conn.commit()
         return jsonify({'success': True, 'message': 'Parameter added successfully'})
 
     except Exception as e:
@@ -1128,553 +1316,29 @@ def api_add_reception_simple():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-# Helper methods for database manager
-def get_reception_complex_list(self):
-    """Get list of complex reception systems"""
-    with sqlite3.connect(self.db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT rc.*, u.username as owner
-            FROM reception_complex rc
-            JOIN users u ON rc.user_id = u.id
-            WHERE rc.user_id = ? OR rc.is_shared = 1
-        """, (self.current_user_id,))
-        return [dict(row) for row in cursor.fetchall()]
-
-def get_reception_simple_list(self):
-    """Get list of simple reception systems"""
-    with sqlite3.connect(self.db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT rs.*, u.username as owner
-            FROM reception_simple rs
-            JOIN users u ON rs.user_id = u.id
-            WHERE rs.user_id = ? OR rs.is_shared = 1
-        """, (self.current_user_id,))
-        return [dict(row) for row in cursor.fetchall()]
-
-
-# Add helper methods to database manager
-SatLinkDatabaseUser.get_reception_complex_list = get_reception_complex_list
-SatLinkDatabaseUser.get_reception_simple_list = get_reception_simple_list
-
-
-# Create templates directory if it doesn't exist
-os.makedirs('templates', exist_ok=True)
-os.makedirs('static', exist_ok=True)
-os.makedirs('static/css', exist_ok=True)
-os.makedirs('static/js', exist_ok=True)
-
-
-# Create basic templates
-index_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>SatLink - Satellite Link Calculator</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="/">SatLink</a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/login">Login</a>
-                <a class="nav-link" href="/register">Register</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container mt-5">
-        <div class="row">
-            <div class="col-md-8 mx-auto">
-                <div class="card">
-                    <div class="card-body">
-                        <h1 class="card-title text-center">SatLink Satellite Link Calculator</h1>
-                        <p class="card-text text-center">
-                            Calculate satellite link budgets with user authentication and sharing capabilities.
-                        </p>
-                        <div class="text-center mt-4">
-                            <a href="/login" class="btn btn-primary btn-lg me-3">Login</a>
-                            <a href="/register" class="btn btn-outline-primary btn-lg">Register</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
-
-login_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Login - SatLink</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="/">SatLink</a>
-        </div>
-    </nav>
-
-    <div class="container mt-5">
-        <div class="row justify-content-center">
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-body">
-                        <h2 class="card-title text-center">Login</h2>
-
-                        {% with messages = get_flashed_messages(with_categories=true) %}
-                            {% if messages %}
-                                {% for category, message in messages %}
-                                    <div class="alert alert-{{ 'danger' if category == 'error' else 'success' }} alert-dismissible fade show">
-                                        {{ message }}
-                                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-                                    </div>
-                                {% endfor %}
-                            {% endif %}
-                        {% endwith %}
-
-                        <form method="POST">
-                            <div class="mb-3">
-                                <label for="username" class="form-label">Username</label>
-                                <input type="text" class="form-control" id="username" name="username" required>
-                            </div>
-                            <div class="mb-3">
-                                <label for="password" class="form-label">Password</label>
-                                <input type="password" class="form-control" id="password" name="password" required>
-                            </div>
-                            <button type="submit" class="btn btn-primary w-100">Login</button>
-                        </form>
-
-                        <div class="text-center mt-3">
-                            <p>Don't have an account? <a href="/register">Register here</a></p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
-
-register_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Register - SatLink</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="/">SatLink</a>
-        </div>
-    </nav>
-
-    <div class="container mt-5">
-        <div class="row justify-content-center">
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-body">
-                        <h2 class="card-title text-center">Register</h2>
-
-                        {% with messages = get_flashed_messages(with_categories=true) %}
-                            {% if messages %}
-                                {% for category, message in messages %}
-                                    <div class="alert alert-{{ 'danger' if category == 'error' else 'success' }} alert-dismissible fade show">
-                                        {{ message }}
-                                        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-                                    </div>
-                                {% endfor %}
-                            {% endif %}
-                        {% endwith %}
-
-                        <form method="POST">
-                            <div class="mb-3">
-                                <label for="username" class="form-label">Username</label>
-                                <input type="text" class="form-control" id="username" name="username" required>
-                            </div>
-                            <div class="mb-3">
-                                <label for="email" class="form-label">Email</label>
-                                <input type="email" class="form-control" id="email" name="email" required>
-                            </div>
-                            <div class="mb-3">
-                                <label for="password" class="form-label">Password</label>
-                                <input type="password" class="form-control" id="password" name="password" required>
-                            </div>
-                            <div class="mb-3">
-                                <label for="confirm_password" class="form-label">Confirm Password</label>
-                                <input type="password" class="form-control" id="confirm_password" name="confirm_password" required>
-                            </div>
-                            <button type="submit" class="btn btn-primary w-100">Register</button>
-                        </form>
-
-                        <div class="text-center mt-3">
-                            <p>Already have an account? <a href="/login">Login here</a></p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
-
-dashboard_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Dashboard - SatLink</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="/">SatLink</a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/dashboard">Dashboard</a>
-                <a class="nav-link" href="/calculate">Calculate</a>
-                <a class="nav-link" href="/calculations">Calculations</a>
-                <a class="nav-link" href="/manage">Manage</a>
-                <a class="nav-link" href="/public">Public</a>
-                <a class="nav-link" href="/profile">Profile</a>
-                <a class="nav-link" href="/logout">Logout</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container mt-5">
-        <h1>Welcome, {{ user_info.username }}!</h1>
-
-        <div class="row mt-4">
-            <div class="col-md-3">
-                <div class="card bg-primary text-white">
-                    <div class="card-body">
-                        <h5 class="card-title">Satellites</h5>
-                        <h3>{{ stats.satellite_positions }}</h3>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card bg-success text-white">
-                    <div class="card-body">
-                        <h5 class="card-title">Transponders</h5>
-                        <h3>{{ stats.transponders }}</h3>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card bg-info text-white">
-                    <div class="card-body">
-                        <h5 class="card-title">Carriers</h5>
-                        <h3>{{ stats.carriers }}</h3>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card bg-warning text-white">
-                    <div class="card-body">
-                        <h5 class="card-title">Calculations</h5>
-                        <h3>{{ stats.link_calculations }}</h3>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <div class="row mt-4">
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Recent Calculations</h5>
-                    </div>
-                    <div class="card-body">
-                        {% if calculations %}
-                            <div class="list-group">
-                                {% for calc in calculations %}
-                                    <a href="/calculations/{{ calc.id }}" class="list-group-item list-group-item-action">
-                                        <h6 class="mb-1">{{ calc.name }}</h6>
-                                        <small class="text-muted">{{ calc.calculation_date }}</small>
-                                    </a>
-                                {% endfor %}
-                            </div>
-                        {% else %}
-                            <p>No calculations yet. <a href="/calculate">Create one</a>.</p>
-                        {% endif %}
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Quick Links</h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="d-grid gap-2">
-                            <a href="/calculate" class="btn btn-primary">New Calculation</a>
-                            <a href="/manage" class="btn btn-secondary">Manage Items</a>
-                            <a href="/public" class="btn btn-info">Browse Public Items</a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>"""
-
-calculate_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Link Calculation - SatLink</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark bg-primary">
-        <div class="container">
-            <a class="navbar-brand" href="/">SatLink</a>
-            <div class="navbar-nav ms-auto">
-                <a class="nav-link" href="/dashboard">Dashboard</a>
-                <a class="nav-link" href="/calculate">Calculate</a>
-                <a class="nav-link" href="/calculations">Calculations</a>
-                <a class="nav-link" href="/manage">Manage</a>
-                <a class="nav-link" href="/public">Public</a>
-                <a class="nav-link" href="/profile">Profile</a>
-                <a class="nav-link" href="/logout">Logout</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container mt-5">
-        <h1>Link Calculation</h1>
-
-        <div class="row">
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Input Parameters</h5>
-                    </div>
-                    <div class="card-body">
-                        <form id="calculationForm">
-                            <div class="mb-3">
-                                <label for="satellite" class="form-label">Satellite</label>
-                                <select class="form-select" id="satellite" name="satellite_id" required>
-                                    <option value="">Select Satellite</option>
-                                    {% for sat in satellites %}
-                                        <option value="{{ sat.id }}">{{ sat.name }} ({{ sat.sat_long }}°)</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-
-                            <div class="mb-3">
-                                <label for="transponder" class="form-label">Transponder</label>
-                                <select class="form-select" id="transponder" name="transponder_id" required>
-                                    <option value="">Select Transponder</option>
-                                </select>
-                            </div>
-
-                            <div class="mb-3">
-                                <label for="carrier" class="form-label">Carrier</label>
-                                <select class="form-select" id="carrier" name="carrier_id" required>
-                                    <option value="">Select Carrier</option>
-                                    {% for car in carriers %}
-                                        <option value="{{ car.id }}">{{ car.name }} ({{ car.modcod }})</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-
-                            <div class="mb-3">
-                                <label for="ground_station" class="form-label">Ground Station</label>
-                                <select class="form-select" id="ground_station" name="ground_station_id" required>
-                                    <option value="">Select Ground Station</option>
-                                    {% for gs in ground_stations %}
-                                        <option value="{{ gs.id }}">{{ gs.name }} ({{ gs.city }}, {{ gs.country }})</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-
-                            <div class="mb-3">
-                                <label for="reception_type" class="form-label">Reception System Type</label>
-                                <select class="form-select" id="reception_type" name="reception_type" required>
-                                    <option value="">Select Type</option>
-                                    <option value="complex">Complex (Detailed Hardware)</option>
-                                    <option value="simple">Simple (G/T Value)</option>
-                                </select>
-                            </div>
-
-                            <div class="mb-3" id="reception_system" style="display: none;">
-                                <label for="reception_id" class="form-label">Reception System</label>
-                                <select class="form-select" id="reception_id" name="reception_id" required>
-                                    <option value="">Select System</option>
-                                </select>
-                            </div>
-
-                            <button type="submit" class="btn btn-primary">Calculate</button>
-                        </form>
-                    </div>
-                </div>
-            </div>
-
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Calculation Results</h5>
-                    </div>
-                    <div class="card-body">
-                        <div id="results" class="text-center">
-                            <p class="text-muted">Complete the form to see results</p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        // Load transponders based on satellite selection
-        document.getElementById('satellite').addEventListener('change', function() {
-            const satId = this.value;
-            const transponderSelect = document.getElementById('transponder');
-
-            if (satId) {
-                transponderSelect.innerHTML = '<option value="">Loading...</option>';
-
-                fetch(`/api/transponders?satellite_id=${satId}`)
-                    .then(response => response.json())
-                    .then(data => {
-                        transponderSelect.innerHTML = '<option value="">Select Transponder</option>';
-                        data.forEach(tp => {
-                            transponderSelect.innerHTML += `<option value="${tp.id}">${tp.name} (${tp.freq} GHz)</option>`;
-                        });
-                    })
-                    .catch(error => {
-                        console.error('Error:', error);
-                        transponderSelect.innerHTML = '<option value="">Error loading transponders</option>';
-                    });
-            } else {
-                transponderSelect.innerHTML = '<option value="">Select Transponder</option>';
-            }
-        });
-
-        // Load reception systems based on type
-        document.getElementById('reception_type').addEventListener('change', function() {
-            const type = this.value;
-            const receptionDiv = document.getElementById('reception_system');
-
-            if (type) {
-                receptionDiv.style.display = 'block';
-                const receptionSelect = document.getElementById('reception_id');
-                receptionSelect.innerHTML = '<option value="">Loading...</option>';
-
-                fetch(`/api/reception_systems?type=${type}`)
-                    .then(response => response.json())
-                    .then(data => {
-                        receptionSelect.innerHTML = '<option value="">Select System</option>';
-                        data.forEach(rs => {
-                            receptionSelect.innerHTML += `<option value="${rs.id}">${rs.name}</option>`;
-                        });
-                    })
-                    .catch(error => {
-                        console.error('Error:', error);
-                        receptionSelect.innerHTML = '<option value="">Error loading systems</option>';
-                    });
-            } else {
-                receptionDiv.style.display = 'none';
-            }
-        });
-
-        // Handle form submission
-        document.getElementById('calculationForm').addEventListener('submit', function(e) {
-            e.preventDefault();
-
-            const formData = new FormData(this);
-            const data = Object.fromEntries(formData);
-
-            fetch('/api/calculate_link', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(data)
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    displayResults(data.results, data.calculation_id);
-                } else {
-                    alert('Error: ' + data.error);
-                }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                alert('An error occurred during calculation');
-            });
-        });
-
-        function displayResults(results, calcId) {
-            const resultsDiv = document.getElementById('results');
-            resultsDiv.innerHTML = `
-                <table class="table table-striped">
-                    <tr><th>Parameter</th><th>Value</th></tr>
-                    <tr><td>Elevation Angle</td><td>${results.elevation_angle?.toFixed(2) || 'N/A'}°</td></tr>
-                    <tr><td>Azimuth Angle</td><td>${results.azimuth_angle?.toFixed(2) || 'N/A'}°</td></tr>
-                    <tr><td>Distance</td><td>${results.distance?.toFixed(0) || 'N/A'} km</td></tr>
-                    <tr><td>Free Space Loss</td><td>${results.a_fs?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Gas Attenuation</td><td>${results.a_g?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Cloud Attenuation</td><td>${results.a_c?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Rain Attenuation</td><td>${results.a_r?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Scintillation</td><td>${results.a_s?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Total Atmospheric Loss</td><td>${results.a_t?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Total Loss</td><td>${results.a_tot?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>C/N0</td><td>${results.cn0?.toFixed(2) || 'N/A'} dB-Hz</td></tr>
-                    <tr><td>SNR</td><td>${results.snr?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>SNR Threshold</td><td>${results.snr_threshold?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Link Margin</td><td>${results.link_margin?.toFixed(2) || 'N/A'} dB</td></tr>
-                    <tr><td>Availability</td><td>${results.availability?.toFixed(1) || 'N/A'}%</td></tr>
-                    <tr><td>G/T</td><td>${results.gt_value?.toFixed(2) || 'N/A'} dB/K</td></tr>
-                </table>
-                <div class="mt-3">
-                    ${calcId ? `<a href="/calculations/${calcId}" class="btn btn-info">View Details</a>` : ''}
-                </div>
-            `;
-        }
-    </script>
-</body>
-</html>"""
-
 # Make login_required available to blueprint
 user_management_bp.login_required = login_required
 
 # Register user management blueprint
 app.register_blueprint(user_management_bp)
 
-# Write templates
-with open('templates/index.html', 'w') as f:
-    f.write(index_html)
-with open('templates/login.html', 'w') as f:
-    f.write(login_html)
-with open('templates/register.html', 'w') as f:
-    f.write(register_html)
-with open('templates/dashboard.html', 'w') as f:
-    f.write(dashboard_html)
-with open('templates/calculate.html', 'w') as f:
-    f.write(calculate_html)
-
 
 if __name__ == '__main__':
     # Initialize database
     init_db('satlink.db')
 
-    # Run the app
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    # Run the app. Prefer waitress when it is installed: it keeps HTTP/1.1
+    # connections alive between the calculate page's API calls, whereas the
+    # werkzeug development server is only meant for debugging. For TLS/HTTP/2,
+    # put nginx in front (listen 443 ssl http2; proxy_http_version 1.1;
+    # proxy_set_header Connection "";).
+    # The handlers block on SQLite, which releases the GIL, so concurrency
+    # comes from worker threads (SATLINK_THREADS) rather than an async loop.
+    # The database's current user is per thread (see set_current_user).
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(debug=True, host='0.0.0.0', port=5001, threaded=True)
+    else:
+        serve(app, host='0.0.0.0', port=5001, channel_timeout=60,
+              threads=SERVER_THREADS)
\ No newline at end of file
@@ -5,44 +5,250 @@ Additional Flask routes for user management, sharing features, and item manageme
 Modified to work with the main app's db instance and login_required decorator.
 """
 
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session
-from models.updated_db_manager import SatLinkDatabaseUser
+import json
+from functools import wraps
+
+from flask import (Blueprint, request, jsonify, render_template, redirect, url_for, flash, session,
+                   make_response, Response, stream_template, get_flashed_messages)
+from models.updated_db_manager import SatLinkDatabaseUser, LRUCache
 
 # Create blueprint
 user_management_bp = Blueprint('user_management', __name__, url_prefix='/manage')
 
 
-def require_login(f):
-    """Runtime login check that doesn't require decorator at import time"""
+def get_db():
+    """Get database instance at runtime"""
+    return getattr(user_management_bp, 'db', None)
+
+
+def require_user(f=None, *, api=False):
+    """Turn away requests without a logged-in user before any SQL runs
+
+    Sets the database's current user from the session, like the app's
+    login_required. Page routes flash and redirect to the login page;
+    ``@require_user(api=True)`` routes, and JSON requests to any route (such
+    as the bulk reception adds, which also take form posts), answer 401 JSON
+    instead.
+    """
+    if f is None:
+        return lambda f: require_user(f, api=api)
+
+    @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'username' not in session:
+        user_id = session.get('user_id')
+        if not user_id or 'username' not in session:
+            if api or request.is_json:
+                return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+            flash('Please login to access this page.', 'error')
             return redirect(url_for('login'))
+
+        db = get_db()
+        if db:
+            db.current_user_id = user_id
         return f(*args, **kwargs)
     return decorated_function
 
 
-def get_db():
-    """Get database instance at runtime"""
-    return getattr(user_management_bp, 'db', None)
+def idempotent(f):
+    """Replay the stored JSON response when a request is retried with the same Idempotency-Key
+
+    Lets clients fire share requests concurrently and retry them blindly.
+    Keys are scoped per user and request path. The key is reserved before
+    the handler runs, so of two concurrent requests with the same key only
+    one executes; the other gets a 409 until the first has stored its
+    response. Only JSON responses are stored, and 5xx responses release the
+    key so a failed request can be retried for real.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        db = get_db()
+        key = request.headers.get('Idempotency-Key')
+        if not key or not db or not db.current_user_id:
+            return f(*args, **kwargs)
+
+        key = f'{request.path} {key}'
+        if not db.reserve_idempotency_key(key):
+            stored = db.get_idempotent_response(key)
+            if stored:
+                response_json, status_code = stored
+                return Response(response_json, status=status_code, mimetype='application/json')
+            return jsonify({'success': False,
+                            'error': 'A request with this Idempotency-Key is in progress'}), 409
 
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.release_idempotency_key(key)
+            raise
+        if response.is_json and response.status_code < 500:
+            db.store_idempotent_response(key, response.get_data(as_text=True), response.status_code)
+        else:
+            db.release_idempotency_key(key)
+        return response
+    return decorated_function
+
+
+
+# Ownership-filtered deletes, run as-is on every delete request so they stay
+# cached as prepared statements on the pooled connection
+DELETE_TRANSPONDER = "DELETE FROM transponders WHERE id = ? AND user_id = ?"
+DELETE_CARRIER = "DELETE FROM carriers WHERE id = ? AND user_id = ?"
+DELETE_RECEPTION_SIMPLE = "DELETE FROM reception_simple WHERE id = ? AND user_id = ?"
+DELETE_RECEPTION_COMPLEX = "DELETE FROM reception_complex WHERE id = ? AND user_id = ?"
+
+# Default for form fields that must be present in the submitted form
+REQUIRED = object()
+
+# Form schemas: (field, type, default) in the argument order of the db.add_* call
+SATELLITE_FORM = (
+    ('name', str, REQUIRED), ('sat_long', float, REQUIRED), ('sat_lat', float, 0.0),
+    ('h_sat', float, 35786.0), ('orbit_type', str, 'GEO'), ('description', str, ''),
+    ('is_shared', bool, False),
+)
+TRANSPONDER_FORM = (
+    ('name', str, REQUIRED), ('freq', float, REQUIRED), ('freq_band', str, None),
+    ('eirp_max', float, 0.0), ('b_transp', float, 36.0), ('back_off', float, 0.0),
+    ('contorno', float, 0.0), ('polarization', str, None), ('satellite_id', int, REQUIRED),
+    ('is_shared', bool, False),
+)
+CARRIER_FORM = (
+    ('name', str, REQUIRED), ('modcod', str, REQUIRED), ('modulation', str, REQUIRED),
+    ('fec', str, REQUIRED), ('roll_off', float, REQUIRED), ('b_util', float, 36.0),
+    ('snr_threshold', float, None), ('spectral_efficiency', float, None),
+    ('standard', str, None), ('description', str, ''), ('is_shared', bool, False),
+)
+GROUND_STATION_FORM = (
+    ('name', str, REQUIRED), ('site_lat', float, REQUIRED), ('site_long', float, REQUIRED),
+    ('site_name', str, None), ('altitude', float, 0.0), ('country', str, None),
+    ('region', str, None), ('city', str, None), ('climate_zone', str, None),
+    ('itu_region', str, None), ('description', str, ''), ('is_shared', bool, False),
+)
+RECEPTION_COMPLEX_FORM = (
+    ('name', str, REQUIRED), ('ant_size', float, REQUIRED), ('ant_eff', float, REQUIRED),
+    ('lnb_gain', float, REQUIRED), ('lnb_temp', float, REQUIRED), ('coupling_loss', float, 0.0),
+    ('cable_loss', float, 0.0), ('polarization_loss', float, 3.0), ('max_depoint', float, 0.0),
+    ('manufacturer', str, None), ('model', str, None), ('description', str, ''),
+    ('is_shared', bool, False),
+)
+RECEPTION_SIMPLE_FORM = (
+    ('name', str, REQUIRED), ('gt_value', float, REQUIRED), ('depoint_loss', float, 0.0),
+    ('frequency', float, None), ('measurement_method', str, None), ('manufacturer', str, None),
+    ('model', str, None), ('description', str, ''), ('is_shared', bool, False),
+)
+
+
+def parse_form(form, schema):
+    """Coerce the submitted fields of ``form`` in one pass over a form schema
+
+    ``form`` is ``request.form`` or a dict decoded from JSON. Returns the
+    values in schema order. Checkboxes (``bool``) are true when sent with a
+    truthy value (a checked box sends 'on', JSON may send true/false), a
+    missing REQUIRED field raises KeyError like ``form[field]``, and a
+    missing or blank optional number falls back to its default.
+    """
+    get = form.get
+    values = []
+    for field, kind, default in schema:
+        if kind is bool:
+            values.append(bool(get(field)))
+            continue
+        value = get(field)
+        if value is None:
+            if default is REQUIRED:
+                raise KeyError(field)
+            values.append(default)
+        elif value == '' and kind is not str and default is not REQUIRED:
+            values.append(default)
+        else:
+            values.append(kind(value))
+    return values
+
+
+def form_updates(form, schema):
+    """parse_form() as a ``{field: value}`` dict, for the keyword arguments of db.update_*"""
+    return dict(zip((field for field, _, _ in schema), parse_form(form, schema)))
+
+
+# Rendered list and add-form pages: (template, user_id) -> (table versions, html),
+# for the most recently used 128 pages
+_page_cache = LRUCache(maxsize=128)
+
+
+def render_cached(template, tables, load_context):
+    """Render a GET page, reusing the previous HTML while its tables are unchanged
+
+    ``load_context`` is only called on a cache miss, so a hit costs neither the
+    queries nor the render. While flashed messages are pending the page is
+    rendered fresh and not stored: the render consumes and shows them, and a
+    cached copy would replay them on every later visit. The response carries
+    an ETag, so a repeat visit with unchanged data is answered with 304.
+    """
+    db = get_db()
+    key = (template, db.current_user_id)
+    versions = tuple(db.get_version(table) for table in tables)
+
+    if session.get('_flashes'):
+        html = render_template(template, **load_context())
+    else:
+        cached = _page_cache.get(key)
+        if cached and cached[0] == versions:
+            html = cached[1]
+        else:
+            html = render_template(template, **load_context())
+            _page_cache[key] = (versions, html)
+
+    response = make_response(html)
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+# Serialized API bodies: (endpoint, args, user_id) -> (table versions, json).
+# The args come from the query string, so the size is bounded like
+# web_app's _cached_options_json.
+_json_cache = LRUCache(maxsize=512)
+
+
+def json_cached(args, tables, load_data):
+    """render_cached() for JSON endpoints: reuse the serialized body while its tables are unchanged
+
+    ``args`` are the request arguments the body depends on; ``load_data`` is
+    only called on a cache miss.
+    """
+    db = get_db()
+    key = (request.endpoint, args, db.current_user_id)
+    versions = tuple(db.get_version(table) for table in tables)
+
+    cached = _json_cache.get(key)
+    if cached and cached[0] == versions:
+        body = cached[1]
+    else:
+        body = json.dumps(load_data())
+        _json_cache[key] = (versions, body)
+
+    response = Response(body, mimetype='application/json')
+    response.add_etag()
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @user_management_bp.route('/satellites')
+@require_user
 def manage_satellites():
     """Manage satellite positions"""
-    # Check if user is logged in
-    if 'username' not in session:
-        return redirect(url_for('login'))
-
     db = get_db()
     if not db:
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    satellites = db.list_satellite_positions(user_id=db.current_user_id, include_shared=False)
-    return render_template('manage_satellites.html', satellites=satellites)
+    return render_cached('manage_satellites.html', ('satellite_positions',), lambda: {
+        'satellites': db.list_satellite_positions(user_id=db.current_user_id, include_shared=False)
+    })
 
 
 @user_management_bp.route('/satellites/add', methods=['GET', 'POST'])
+@require_user
 def add_satellite():
     """Add new satellite position"""
     db = get_db()
@@ -52,18 +258,7 @@ def add_satellite():
 
     if request.method == 'POST':
         try:
-            name = request.form['name']
-            sat_long = float(request.form['sat_long'])
-            sat_lat = float(request.form.get('sat_lat', 0))
-            h_sat = float(request.form.get('h_sat', 35786))
-            orbit_type = request.form.get('orbit_type', 'GEO')
-            description = request.form.get('description', '')
-            is_shared = 'is_shared' in request.form
-
-            sat_id = db.add_satellite_position(
-                name, sat_long, sat_lat, h_sat, orbit_type,
-                description, is_shared
-            )
+            sat_id = db.add_satellite_position(*parse_form(request.form, SATELLITE_FORM))
 
             flash('Satellite added successfully!', 'success')
             return redirect(url_for('user_management.manage_satellites'))
@@ -72,10 +267,11 @@ def add_satellite():
             flash(f'Error adding satellite: {str(e)}', 'error')
             return render_template('add_satellite.html')
 
-    return render_template('add_satellite.html')
+    return render_cached('add_satellite.html', (), dict)
 
 
 @user_management_bp.route('/satellites/<int:sat_id>/edit', methods=['GET', 'POST'])
+@require_user
 def edit_satellite(sat_id):
     """Edit satellite position"""
     db = get_db()
@@ -83,12 +279,8 @@ def edit_satellite(sat_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    # Get satellite details
-    satellite = None
-    for sat in db.list_satellite_positions():
-        if sat['id'] == sat_id and sat['user_id'] == db.current_user_id:
-            satellite = sat
-            break
+    # Get satellite details; only found if the user owns it
+    satellite = db.get_row('satellite_positions', sat_id, user_id=db.current_user_id)
 
     if not satellite:
         flash('Satellite not found or access denied.', 'error')
@@ -96,15 +288,7 @@ def edit_satellite(sat_id):
 
     if request.method == 'POST':
         try:
-            updates = {
-                'name': request.form['name'],
-                'sat_long': float(request.form['sat_long']),
-                'sat_lat': float(request.form.get('sat_lat', 0)),
-                'h_sat': float(request.form.get('h_sat', 35786)),
-                'orbit_type': request.form.get('orbit_type', 'GEO'),
-                'description': request.form.get('description', ''),
-                'is_shared': 'is_shared' in request.form
-            }
+            updates = form_updates(request.form, SATELLITE_FORM)
 
             success = db.update_satellite_position(sat_id, **updates)
             if success:
@@ -120,6 +304,7 @@ def edit_satellite(sat_id):
 
 
 @user_management_bp.route('/satellites/<int:sat_id>/delete', methods=['POST'])
+@require_user
 def delete_satellite(sat_id):
     """Delete satellite position"""
     db = get_db()
@@ -140,6 +325,8 @@ def delete_satellite(sat_id):
 
 
 @user_management_bp.route('/satellites/<int:sat_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_satellite_share(sat_id):
     """Toggle satellite sharing status"""
     db = get_db()
@@ -147,34 +334,26 @@ def toggle_satellite_share(sat_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        satellite = None
-        for sat in db.list_satellite_positions():
-            if sat['id'] == sat_id:
-                satellite = sat
-                break
-
-        if not satellite or satellite['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the satellite
+        is_shared = db.toggle_satellite_share(sat_id)
 
-        # Toggle sharing
-        if satellite['is_shared']:
-            success = db.make_satellite_private(sat_id)
-            action = 'unshared'
-        else:
-            success = db.make_satellite_public(sat_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            return jsonify({'success': True, 'action': action})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Satellite {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/transponders')
+@require_user
 def manage_transponders():
     """Manage transponders"""
     db = get_db()
@@ -182,14 +361,18 @@ def manage_transponders():
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    transponders = db.list_transponders(user_id=db.current_user_id, include_shared=False)
-    satellites = db.list_satellite_positions()
-    return render_template('manage_transponders.html',
-                         transponders=transponders,
-                         satellites=satellites)
+    def load_context():
+        transponders, satellites = db.gather(
+            lambda: db.list_transponders(user_id=db.current_user_id, include_shared=False, as_rows=True),
+            lambda: db.list_satellite_positions()
+        )
+        return {'transponders': transponders, 'satellites': satellites}
+
+    return render_cached('manage_transponders.html', ('transponders', 'satellite_positions'), load_context)
 
 
 @user_management_bp.route('/transponders/add', methods=['GET', 'POST'])
+@require_user
 def add_transponder():
     """Add new transponder"""
     db = get_db()
@@ -197,37 +380,27 @@ def add_transponder():
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    satellites = db.list_satellite_positions(user_id=db.current_user_id, include_shared=True)
+    def load_satellites():
+        return db.list_satellite_positions(user_id=db.current_user_id, include_shared=True)
 
     if request.method == 'POST':
         try:
-            name = request.form['name']
-            freq = float(request.form['freq'])
-            freq_band = request.form.get('freq_band')
-            eirp_max = float(request.form.get('eirp_max', 0))
-            b_transp = float(request.form.get('b_transp', 36))
-            back_off = float(request.form.get('back_off', 0))
-            contorno = float(request.form.get('contorno', 0))
-            polarization = request.form.get('polarization')
-            satellite_id = int(request.form['satellite_id'])
-            is_shared = 'is_shared' in request.form
-
-            tp_id = db.add_transponder(
-                name, freq, freq_band, eirp_max, b_transp,
-                back_off, contorno, polarization, satellite_id, is_shared
-            )
+            tp_id = db.add_transponder(*parse_form(request.form, TRANSPONDER_FORM))
 
             flash('Transponder added successfully!', 'success')
             return redirect(url_for('user_management.manage_transponders'))
 
         except Exception as e:
             flash(f'Error adding transponder: {str(e)}', 'error')
-            return render_template('add_transponder.html', satellites=satellites)
+            return render_template('add_transponder.html', satellites=load_satellites())
 
-    return render_template('add_transponder.html', satellites=satellites)
+    return render_cached('add_transponder.html', ('satellite_positions',),
+                         lambda: {'satellites': load_satellites()})
 
 
 @user_management_bp.route('/transponders/<int:tp_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_transponder_share(tp_id):
     """Toggle transponder sharing status"""
     db = get_db()
@@ -235,42 +408,26 @@ def toggle_transponder_share(tp_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        transponder = None
-        for tp in db.list_transponders():
-            if tp['id'] == tp_id:
-                transponder = tp
-                break
-
-        if not transponder or transponder['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the transponder
+        is_shared = db.toggle_transponder_share(tp_id)
 
-        # Toggle sharing
-        if transponder['is_shared']:
-            success = db.make_transponder_private(tp_id)
-            action = 'unshared'
-        else:
-            success = db.make_transponder_public(tp_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            # Get updated status
-            for tp in db.list_transponders():
-                if tp['id'] == tp_id:
-                    return jsonify({
-                        'success': True,
-                        'action': action,
-                        'is_shared': tp['is_shared'],
-                        'message': f'Transponder {action} successfully'
-                    })
-
-        return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Transponder {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/transponders/<int:tp_id>/edit', methods=['POST'])
+@require_user
 def edit_transponder(tp_id):
     """Edit transponder"""
     db = get_db()
@@ -279,41 +436,12 @@ def edit_transponder(tp_id):
         return redirect(url_for('user_management.manage_transponders'))
 
     # Check ownership
-    transponder = None
-    for tp in db.list_transponders():
-        if tp['id'] == tp_id:
-            transponder = tp
-            break
-
-    if not transponder or transponder['user_id'] != db.current_user_id:
+    if not db.check_owner('transponders', tp_id):
         flash('Access denied.', 'error')
         return redirect(url_for('user_management.manage_transponders'))
 
     try:
-        name = request.form['name']
-        freq = float(request.form['freq'])
-        freq_band = request.form.get('freq_band')
-        eirp_max = float(request.form.get('eirp_max', 0))
-        b_transp = float(request.form.get('b_transp', 36))
-        back_off = float(request.form.get('back_off', 0))
-        contorno = float(request.form.get('contorno', 0))
-        polarization = request.form.get('polarization')
-        satellite_id = int(request.form['satellite_id'])
-        is_shared = 'is_shared' in request.form
-
-        success = db.update_transponder(
-            tp_id,
-            name=name,
-            freq=freq,
-            freq_band=freq_band,
-            eirp_max=eirp_max,
-            b_transp=b_transp,
-            back_off=back_off,
-            contorno=contorno,
-            polarization=polarization,
-            satellite_id=satellite_id,
-            is_shared=is_shared
-        )
+        success = db.update_transponder(tp_id, **form_updates(request.form, TRANSPONDER_FORM))
 
         if success:
             flash('Transponder updated successfully!', 'success')
@@ -326,6 +454,7 @@ def edit_transponder(tp_id):
 
 
 @user_management_bp.route('/transponders/<int:tp_id>/delete', methods=['POST'])
+@require_user
 def delete_transponder(tp_id):
     """Delete transponder"""
     db = get_db()
@@ -333,26 +462,15 @@ def delete_transponder(tp_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_transponders'))
 
-    # Check ownership first
-    transponder = None
-    for tp in db.list_transponders():
-        if tp['id'] == tp_id:
-            transponder = tp
-            break
-
-    if not transponder or transponder['user_id'] != db.current_user_id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('user_management.manage_transponders'))
-
     try:
-        # Delete transponder
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM transponders WHERE id = ?", (tp_id,))
-            conn.commit()
-
-        flash('Transponder deleted successfully!', 'success')
+        # Delete transponder; ownership is checked by the DELETE itself
+        deleted = db.execute(DELETE_TRANSPONDER, (tp_id, db.current_user_id)).rowcount
+
+        if deleted:
+            db.bump_version('transponders')
+            flash('Transponder deleted successfully!', 'success')
+        else:
+            flash('Transponder not found or access denied.', 'error')
     except Exception as e:
         flash(f'Error deleting transponder: {str(e)}', 'error')
 
@@ -360,6 +478,7 @@ def delete_transponder(tp_id):
 
 
 @user_management_bp.route('/carriers')
+@require_user
 def manage_carriers():
     """Manage carrier configurations"""
     db = get_db()
@@ -367,11 +486,13 @@ def manage_carriers():
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    carriers = db.list_carriers(user_id=db.current_user_id, include_shared=False)
-    return render_template('manage_carriers.html', carriers=carriers)
+    return render_cached('manage_carriers.html', ('carriers',), lambda: {
+        'carriers': db.list_carriers(user_id=db.current_user_id, include_shared=False, as_rows=True)
+    })
 
 
 @user_management_bp.route('/carriers/add', methods=['GET', 'POST'])
+@require_user
 def add_carrier():
     """Add new carrier configuration"""
     if request.method == 'POST':
@@ -381,22 +502,7 @@ def add_carrier():
             return redirect(url_for('dashboard'))
 
         try:
-            name = request.form['name']
-            modcod = request.form['modcod']
-            modulation = request.form['modulation']
-            fec = request.form['fec']
-            roll_off = float(request.form['roll_off'])
-            b_util = float(request.form.get('b_util', 36))
-            snr_threshold = float(request.form.get('snr_threshold', 0)) if request.form.get('snr_threshold') else None
-            spectral_efficiency = float(request.form.get('spectral_efficiency', 0)) if request.form.get('spectral_efficiency') else None
-            standard = request.form.get('standard')
-            description = request.form.get('description', '')
-            is_shared = 'is_shared' in request.form
-
-            car_id = db.add_carrier(
-                name, modcod, modulation, fec, roll_off, b_util,
-                snr_threshold, spectral_efficiency, standard, description, is_shared
-            )
+            car_id = db.add_carrier(*parse_form(request.form, CARRIER_FORM))
 
             flash('Carrier configuration added successfully!', 'success')
             return redirect(url_for('user_management.manage_carriers'))
@@ -405,10 +511,12 @@ def add_carrier():
             flash(f'Error adding carrier: {str(e)}', 'error')
             return render_template('add_carrier.html')
 
-    return render_template('add_carrier.html')
+    return render_cached('add_carrier.html', (), dict)
 
 
 @user_management_bp.route('/carriers/<int:car_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_carrier_share(car_id):
     """Toggle carrier sharing status"""
     db = get_db()
@@ -416,42 +524,26 @@ def toggle_carrier_share(car_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        carrier = None
-        for car in db.list_carriers():
-            if car['id'] == car_id:
-                carrier = car
-                break
-
-        if not carrier or carrier['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the carrier
+        is_shared = db.toggle_carrier_share(car_id)
 
-        # Toggle sharing
-        if carrier['is_shared']:
-            success = db.make_carrier_private(car_id)
-            action = 'unshared'
-        else:
-            success = db.make_carrier_public(car_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            # Get updated status
-            for car in db.list_carriers():
-                if car['id'] == car_id:
-                    return jsonify({
-                        'success': True,
-                        'action': action,
-                        'is_shared': car['is_shared'],
-                        'message': f'Carrier {action} successfully'
-                    })
-
-        return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Carrier {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/carriers/<int:car_id>/edit', methods=['POST'])
+@require_user
 def edit_carrier(car_id):
     """Edit carrier configuration"""
     db = get_db()
@@ -460,43 +552,12 @@ def edit_carrier(car_id):
         return redirect(url_for('user_management.manage_carriers'))
 
     # Check ownership
-    carrier = None
-    for car in db.list_carriers():
-        if car['id'] == car_id:
-            carrier = car
-            break
-
-    if not carrier or carrier['user_id'] != db.current_user_id:
+    if not db.check_owner('carriers', car_id):
         flash('Access denied.', 'error')
         return redirect(url_for('user_management.manage_carriers'))
 
     try:
-        name = request.form['name']
-        modcod = request.form['modcod']
-        modulation = request.form['modulation']
-        fec = request.form['fec']
-        roll_off = float(request.form['roll_off'])
-        b_util = float(request.form.get('b_util', 36))
-        snr_threshold = float(request.form['snr_threshold']) if request.form.get('snr_threshold') else None
-        spectral_efficiency = float(request.form['spectral_efficiency']) if request.form.get('spectral_efficiency') else None
-        standard = request.form.get('standard')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        success = db.update_carrier(
-            car_id,
-            name=name,
-            modcod=modcod,
-            modulation=modulation,
-            fec=fec,
-            roll_off=roll_off,
-            b_util=b_util,
-            snr_threshold=snr_threshold,
-            spectral_efficiency=spectral_efficiency,
-            standard=standard,
-            description=description,
-            is_shared=is_shared
-        )
+        success = db.update_carrier(car_id, **form_updates(request.form, CARRIER_FORM))
 
         if success:
             flash('Carrier configuration updated successfully!', 'success')
@@ -509,6 +570,7 @@ def edit_carrier(car_id):
 
 
 @user_management_bp.route('/carriers/<int:car_id>/delete', methods=['POST'])
+@require_user
 def delete_carrier(car_id):
     """Delete carrier configuration"""
     db = get_db()
@@ -516,26 +578,15 @@ def delete_carrier(car_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_carriers'))
 
-    # Check ownership first
-    carrier = None
-    for car in db.list_carriers():
-        if car['id'] == car_id:
-            carrier = car
-            break
-
-    if not carrier or carrier['user_id'] != db.current_user_id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('user_management.manage_carriers'))
-
     try:
-        # Delete carrier
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM carriers WHERE id = ?", (car_id,))
-            conn.commit()
-
-        flash('Carrier configuration deleted successfully!', 'success')
+        # Delete carrier; ownership is checked by the DELETE itself
+        deleted = db.execute(DELETE_CARRIER, (car_id, db.current_user_id)).rowcount
+
+        if deleted:
+            db.bump_version('carriers')
+            flash('Carrier configuration deleted successfully!', 'success')
+        else:
+            flash('Carrier not found or access denied.', 'error')
     except Exception as e:
         flash(f'Error deleting carrier: {str(e)}', 'error')
 
@@ -543,6 +594,7 @@ def delete_carrier(car_id):
 
 
 @user_management_bp.route('/ground_stations')
+@require_user
 def manage_ground_stations():
     """Manage ground stations"""
     db = get_db()
@@ -550,14 +602,18 @@ def manage_ground_stations():
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    ground_stations = db.list_ground_stations(user_id=db.current_user_id, include_shared=False)
-    countries = sorted(set(gs['country'] for gs in ground_stations if gs['country']))
-    return render_template('manage_ground_stations.html',
-                         ground_stations=ground_stations,
-                         countries=countries)
+    def load_context():
+        ground_stations, countries = db.gather(
+            lambda: db.list_ground_stations(user_id=db.current_user_id, include_shared=False, as_rows=True),
+            lambda: db.list_distinct_countries(user_id=db.current_user_id, include_shared=False)
+        )
+        return {'ground_stations': ground_stations, 'countries': countries}
+
+    return render_cached('manage_ground_stations.html', ('ground_stations',), load_context)
 
 
 @user_management_bp.route('/ground_stations/add', methods=['GET', 'POST'])
+@require_user
 def add_ground_station():
     """Add new ground station"""
     if request.method == 'POST':
@@ -567,24 +623,7 @@ def add_ground_station():
             return redirect(url_for('dashboard'))
 
         try:
-            name = request.form['name']
-            site_lat = float(request.form['site_lat'])
-            site_long = float(request.form['site_long'])
-            site_name = request.form.get('site_name')
-            altitude = float(request.form.get('altitude', 0))
-            country = request.form.get('country')
-            region = request.form.get('region')
-            city = request.form.get('city')
-            climate_zone = request.form.get('climate_zone')
-            itu_region = request.form.get('itu_region')
-            description = request.form.get('description', '')
-            is_shared = 'is_shared' in request.form
-
-            gs_id = db.add_ground_station(
-                name, site_lat, site_long, site_name, altitude,
-                country, region, city, climate_zone, itu_region,
-                description, is_shared
-            )
+            gs_id = db.add_ground_station(*parse_form(request.form, GROUND_STATION_FORM))
 
             flash('Ground station added successfully!', 'success')
             return redirect(url_for('user_management.manage_ground_stations'))
@@ -593,10 +632,12 @@ def add_ground_station():
             flash(f'Error adding ground station: {str(e)}', 'error')
             return render_template('add_ground_station.html')
 
-    return render_template('add_ground_station.html')
+    return render_cached('add_ground_station.html', (), dict)
 
 
 @user_management_bp.route('/ground_stations/<int:gs_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_ground_station_share(gs_id):
     """Toggle ground station sharing status"""
     db = get_db()
@@ -604,42 +645,26 @@ def toggle_ground_station_share(gs_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        ground_station = None
-        for gs in db.list_ground_stations():
-            if gs['id'] == gs_id:
-                ground_station = gs
-                break
-
-        if not ground_station or ground_station['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the ground station
+        is_shared = db.toggle_ground_station_share(gs_id)
 
-        # Toggle sharing
-        if ground_station['is_shared']:
-            success = db.make_ground_station_private(gs_id)
-            action = 'unshared'
-        else:
-            success = db.make_ground_station_public(gs_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            # Get updated status
-            for gs in db.list_ground_stations():
-                if gs['id'] == gs_id:
-                    return jsonify({
-                        'success': True,
-                        'action': action,
-                        'is_shared': gs['is_shared'],
-                        'message': f'Ground station {action} successfully'
-                    })
-
-        return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Ground station {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/ground_stations/<int:gs_id>/edit', methods=['POST'])
+@require_user
 def edit_ground_station(gs_id):
     """Edit ground station"""
     db = get_db()
@@ -648,45 +673,12 @@ def edit_ground_station(gs_id):
         return redirect(url_for('user_management.manage_ground_stations'))
 
     # Check ownership
-    station = None
-    for gs in db.list_ground_stations():
-        if gs['id'] == gs_id:
-            station = gs
-            break
-
-    if not station or station['user_id'] != db.current_user_id:
+    if not db.check_owner('ground_stations', gs_id):
         flash('Access denied.', 'error')
         return redirect(url_for('user_management.manage_ground_stations'))
 
     try:
-        name = request.form['name']
-        site_lat = float(request.form['site_lat'])
-        site_long = float(request.form['site_long'])
-        site_name = request.form.get('site_name')
-        altitude = float(request.form.get('altitude', 0))
-        country = request.form.get('country')
-        region = request.form.get('region')
-        city = request.form.get('city')
-        climate_zone = request.form.get('climate_zone')
-        itu_region = request.form.get('itu_region')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        success = db.update_ground_station(
-            gs_id,
-            name=name,
-            site_lat=site_lat,
-            site_long=site_long,
-            site_name=site_name,
-            altitude=altitude,
-            country=country,
-            region=region,
-            city=city,
-            climate_zone=climate_zone,
-            itu_region=itu_region,
-            description=description,
-            is_shared=is_shared
-        )
+        success = db.update_ground_station(gs_id, **form_updates(request.form, GROUND_STATION_FORM))
 
         if success:
             flash('Ground station updated successfully!', 'success')
@@ -699,6 +691,7 @@ def edit_ground_station(gs_id):
 
 
 @user_management_bp.route('/ground_stations/<int:gs_id>/delete', methods=['POST'])
+@require_user
 def delete_ground_station(gs_id):
     """Delete ground station"""
     db = get_db()
@@ -706,30 +699,11 @@ def delete_ground_station(gs_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_ground_stations'))
 
-    # Check ownership first
-    gs = None
-    for ground_station in db.list_ground_stations():
-        if ground_station['id'] == gs_id:
-            gs = ground_station
-            break
-
-    if not gs or gs['user_id'] != db.current_user_id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('user_management.manage_ground_stations'))
-
     try:
         # Delete ground station and related reception systems
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Delete reception systems
-            cursor.execute("DELETE FROM reception_complex WHERE ground_station_id = ?", (gs_id,))
-            cursor.execute("DELETE FROM reception_simple WHERE ground_station_id = ?", (gs_id,))
-
-            # Delete ground station
-            cursor.execute("DELETE FROM ground_stations WHERE id = ?", (gs_id,))
-            conn.commit()
+        if not db.delete_ground_station(gs_id):
+            flash('Access denied.', 'error')
+            return redirect(url_for('user_management.manage_ground_stations'))
 
         flash('Ground station deleted successfully!', 'success')
     except Exception as e:
@@ -739,6 +713,7 @@ def delete_ground_station(gs_id):
 
 
 @user_management_bp.route('/reception_complex/add', methods=['POST'])
+@require_user
 def add_reception_complex():
     """Add complex reception system via API"""
     db = get_db()
@@ -746,26 +721,16 @@ def add_reception_complex():
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
+    if request.is_json:
+        # A JSON array of systems is added in one transaction
+        try:
+            rows = [parse_form(row, RECEPTION_COMPLEX_FORM) for row in request.get_json()]
+            return jsonify({'success': True, 'ids': db.add_reception_complex_bulk(rows)})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
     try:
-        name = request.form['name']
-        ant_size = float(request.form['ant_size'])
-        ant_eff = float(request.form['ant_eff'])
-        lnb_gain = float(request.form['lnb_gain'])
-        lnb_temp = float(request.form['lnb_temp'])
-        coupling_loss = float(request.form.get('coupling_loss', 0))
-        cable_loss = float(request.form.get('cable_loss', 0))
-        polarization_loss = float(request.form.get('polarization_loss', 3))
-        max_depoint = float(request.form.get('max_depoint', 0))
-        manufacturer = request.form.get('manufacturer')
-        model = request.form.get('model')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        rec_id = db.add_reception_complex(
-            name, ant_size, ant_eff, lnb_gain, lnb_temp,
-            coupling_loss, cable_loss, polarization_loss, max_depoint,
-            manufacturer, model, description, is_shared
-        )
+        rec_id = db.add_reception_complex(*parse_form(request.form, RECEPTION_COMPLEX_FORM))
 
         flash('Complex reception system added successfully!', 'success')
     except Exception as e:
@@ -775,6 +740,7 @@ def add_reception_complex():
 
 
 @user_management_bp.route('/reception_simple/add', methods=['POST'])
+@require_user
 def add_reception_simple():
     """Add simple reception system via API"""
     db = get_db()
@@ -782,22 +748,16 @@ def add_reception_simple():
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
+    if request.is_json:
+        # A JSON array of systems is added in one transaction
+        try:
+            rows = [parse_form(row, RECEPTION_SIMPLE_FORM) for row in request.get_json()]
+            return jsonify({'success': True, 'ids': db.add_reception_simple_bulk(rows)})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
     try:
-        name = request.form['name']
-        gt_value = float(request.form['gt_value'])
-        depoint_loss = float(request.form.get('depoint_loss', 0))
-        frequency = float(request.form.get('frequency', 0)) if request.form.get('frequency') else None
-        measurement_method = request.form.get('measurement_method')
-        manufacturer = request.form.get('manufacturer')
-        model = request.form.get('model')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        rec_id = db.add_reception_simple(
-            name, gt_value, depoint_loss,
-            frequency, measurement_method, manufacturer, model,
-            description, is_shared
-        )
+        rec_id = db.add_reception_simple(*parse_form(request.form, RECEPTION_SIMPLE_FORM))
 
         flash('Simple reception system added successfully!', 'success')
     except Exception as e:
@@ -811,6 +771,7 @@ def add_reception_simple():
 # =========================================================================
 
 @user_management_bp.route('/reception_systems')
+@require_user
 def manage_reception_systems():
     """Manage all reception systems (both simple and complex)"""
     db = get_db()
@@ -818,15 +779,20 @@ def manage_reception_systems():
         flash('Database not initialized', 'error')
         return redirect(url_for('dashboard'))
 
-    simple_systems = db.list_reception_simple(user_id=db.current_user_id, include_shared=False)
-    complex_systems = db.list_reception_complex(user_id=db.current_user_id, include_shared=False)
+    systems = db.list_user_reception_systems()
 
-    return render_template('manage_reception_systems.html',
-                         simple_systems=simple_systems,
-                         complex_systems=complex_systems)
+    # Stream the page so the browser gets the head and layout while the
+    # system tables are still rendering. Pending flashes are popped here: the
+    # session cookie is written before a streamed body renders, so a pop from
+    # inside the template would not be saved.
+    get_flashed_messages()
+    return Response(stream_template('manage_reception_systems.html',
+                                    simple_systems=systems['simple'],
+                                    complex_systems=systems['complex']))
 
 
 @user_management_bp.route('/reception_simple/<int:rs_id>/delete', methods=['POST'])
+@require_user
 def delete_reception_simple(rs_id):
     """Delete simple reception system"""
     db = get_db()
@@ -834,24 +800,15 @@ def delete_reception_simple(rs_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
-    # Check ownership
-    rec = None
-    for r in db.list_reception_simple():
-        if r['id'] == rs_id:
-            rec = r
-            break
-
-    if not rec or rec['user_id'] != db.current_user_id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('user_management.manage_reception_systems'))
-
     try:
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM reception_simple WHERE id = ?", (rs_id,))
-            conn.commit()
-        flash('Simple reception system deleted successfully!', 'success')
+        # Delete the system; ownership is checked by the DELETE itself
+        deleted = db.execute(DELETE_RECEPTION_SIMPLE, (rs_id, db.current_user_id)).rowcount
+
+        if deleted:
+            db.bump_version('reception_simple')
+            flash('Simple reception system deleted successfully!', 'success')
+        else:
+            flash('Reception system not found or access denied.', 'error')
     except Exception as e:
         flash(f'Error deleting: {str(e)}', 'error')
 
@@ -859,6 +816,7 @@ def delete_reception_simple(rs_id):
 
 
 @user_management_bp.route('/reception_complex/<int:rc_id>/delete', methods=['POST'])
+@require_user
 def delete_reception_complex(rc_id):
     """Delete complex reception system"""
     db = get_db()
@@ -866,24 +824,15 @@ def delete_reception_complex(rc_id):
         flash('Database not initialized', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
-    # Check ownership
-    rec = None
-    for r in db.list_reception_complex():
-        if r['id'] == rc_id:
-            rec = r
-            break
-
-    if not rec or rec['user_id'] != db.current_user_id:
-        flash('Access denied.', 'error')
-        return redirect(url_for('user_management.manage_reception_systems'))
-
     try:
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM reception_complex WHERE id = ?", (rc_id,))
-            conn.commit()
-        flash('Complex reception system deleted successfully!', 'success')
+        # Delete the system; ownership is checked by the DELETE itself
+        deleted = db.execute(DELETE_RECEPTION_COMPLEX, (rc_id, db.current_user_id)).rowcount
+
+        if deleted:
+            db.bump_version('reception_complex')
+            flash('Complex reception system deleted successfully!', 'success')
+        else:
+            flash('Reception system not found or access denied.', 'error')
     except Exception as e:
         flash(f'Error deleting: {str(e)}', 'error')
 
@@ -891,6 +840,7 @@ def delete_reception_complex(rc_id):
 
 
 @user_management_bp.route('/reception_simple/<int:rs_id>/edit', methods=['POST'])
+@require_user
 def edit_reception_simple(rs_id):
     """Edit simple reception system"""
     db = get_db()
@@ -899,37 +849,12 @@ def edit_reception_simple(rs_id):
         return redirect(url_for('user_management.manage_reception_systems'))
 
     # Check ownership
-    rec = None
-    for r in db.list_reception_simple():
-        if r['id'] == rs_id:
-            rec = r
-            break
-
-    if not rec or rec['user_id'] != db.current_user_id:
+    if not db.check_owner('reception_simple', rs_id):
         flash('Access denied.', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
     try:
-        gt_value = float(request.form['gt_value'])
-        depoint_loss = float(request.form.get('depoint_loss', 0))
-        frequency = float(request.form['frequency']) if request.form.get('frequency') else None
-        measurement_method = request.form.get('measurement_method')
-        manufacturer = request.form.get('manufacturer')
-        model = request.form.get('model')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        success = db.update_reception_simple(
-            rs_id,
-            gt_value=gt_value,
-            depoint_loss=depoint_loss,
-            frequency=frequency,
-            measurement_method=measurement_method,
-            manufacturer=manufacturer,
-            model=model,
-            description=description,
-            is_shared=is_shared
-        )
+        success = db.update_reception_simple(rs_id, **form_updates(request.form, RECEPTION_SIMPLE_FORM))
 
         if success:
             flash('Simple reception system updated successfully!', 'success')
@@ -942,6 +867,7 @@ def edit_reception_simple(rs_id):
 
 
 @user_management_bp.route('/reception_complex/<int:rc_id>/edit', methods=['POST'])
+@require_user
 def edit_reception_complex(rc_id):
     """Edit complex reception system"""
     db = get_db()
@@ -950,45 +876,12 @@ def edit_reception_complex(rc_id):
         return redirect(url_for('user_management.manage_reception_systems'))
 
     # Check ownership
-    rec = None
-    for r in db.list_reception_complex():
-        if r['id'] == rc_id:
-            rec = r
-            break
-
-    if not rec or rec['user_id'] != db.current_user_id:
+    if not db.check_owner('reception_complex', rc_id):
         flash('Access denied.', 'error')
         return redirect(url_for('user_management.manage_reception_systems'))
 
     try:
-        ant_size = float(request.form['ant_size'])
-        ant_eff = float(request.form['ant_eff'])
-        lnb_gain = float(request.form['lnb_gain'])
-        lnb_temp = float(request.form['lnb_temp'])
-        coupling_loss = float(request.form.get('coupling_loss', 0))
-        cable_loss = float(request.form.get('cable_loss', 0))
-        polarization_loss = float(request.form.get('polarization_loss', 3))
-        max_depoint = float(request.form.get('max_depoint', 0))
-        manufacturer = request.form.get('manufacturer')
-        model = request.form.get('model')
-        description = request.form.get('description', '')
-        is_shared = 'is_shared' in request.form
-
-        success = db.update_reception_complex(
-            rc_id,
-            ant_size=ant_size,
-            ant_eff=ant_eff,
-            lnb_gain=lnb_gain,
-            lnb_temp=lnb_temp,
-            coupling_loss=coupling_loss,
-            cable_loss=cable_loss,
-            polarization_loss=polarization_loss,
-            max_depoint=max_depoint,
-            manufacturer=manufacturer,
-            model=model,
-            description=description,
-            is_shared=is_shared
-        )
+        success = db.update_reception_complex(rc_id, **form_updates(request.form, RECEPTION_COMPLEX_FORM))
 
         if success:
             flash('Complex reception system updated successfully!', 'success')
@@ -1001,6 +894,8 @@ def edit_reception_complex(rc_id):
 
 
 @user_management_bp.route('/reception_simple/<int:rs_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_reception_simple_share(rs_id):
     """Toggle simple reception system sharing status"""
     db = get_db()
@@ -1008,42 +903,27 @@ def toggle_reception_simple_share(rs_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        rec = None
-        for r in db.list_reception_simple():
-            if r['id'] == rs_id:
-                rec = r
-                break
-
-        if not rec or rec['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the system
+        is_shared = db.toggle_reception_simple_share(rs_id)
 
-        # Toggle sharing
-        if rec['is_shared']:
-            success = db.make_reception_simple_private(rs_id)
-            action = 'unshared'
-        else:
-            success = db.make_reception_simple_public(rs_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            # Get updated status
-            for r in db.list_reception_simple():
-                if r['id'] == rs_id:
-                    return jsonify({
-                        'success': True,
-                        'action': action,
-                        'is_shared': r['is_shared'],
-                        'message': f'Simple reception system {action} successfully'
-                    })
-
-        return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Simple reception system {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/reception_complex/<int:rc_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_reception_complex_share(rc_id):
     """Toggle complex reception system sharing status"""
     db = get_db()
@@ -1051,42 +931,27 @@ def toggle_reception_complex_share(rc_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        rec = None
-        for r in db.list_reception_complex():
-            if r['id'] == rc_id:
-                rec = r
-                break
-
-        if not rec or rec['user_id'] != db.current_user_id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+        # Toggle sharing; no row comes back unless the user owns the system
+        is_shared = db.toggle_reception_complex_share(rc_id)
 
-        # Toggle sharing
-        if rec['is_shared']:
-            success = db.make_reception_complex_private(rc_id)
-            action = 'unshared'
-        else:
-            success = db.make_reception_complex_public(rc_id)
-            action = 'shared'
+        if is_shared is None:
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        if success:
-            # Get updated status
-            for r in db.list_reception_complex():
-                if r['id'] == rc_id:
-                    return jsonify({
-                        'success': True,
-                        'action': action,
-                        'is_shared': r['is_shared'],
-                        'message': f'Complex reception system {action} successfully'
-                    })
-
-        return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        action = 'shared' if is_shared else 'unshared'
+        return jsonify({
+            'success': True,
+            'action': action,
+            'is_shared': is_shared,
+            'message': f'Complex reception system {action} successfully'
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/calculations/<int:calc_id>/share', methods=['POST'])
+@require_user(api=True)
+@idempotent
 def toggle_calculation_share(calc_id):
     """Toggle calculation sharing status"""
     db = get_db()
@@ -1094,29 +959,18 @@ def toggle_calculation_share(calc_id):
         return jsonify({'success': False, 'error': 'Database not initialized'}), 500
 
     try:
-        # Check ownership
-        calculation = None
-        for calc in db.list_link_calculations():
-            if calc['id'] == calc_id:
-                calculation = calc
-                break
-
-        if not calculation or calculation['user_id'] != db.current_user_id:
+        # Share; the UPDATE only matches if the user owns the calculation
+        if not db.make_link_public_if_owner(calc_id):
             return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-        # Toggle sharing
-        success = db.make_link_public(calc_id)
-
-        if success:
-            return jsonify({'success': True, 'action': 'shared'})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to update sharing'}), 500
+        return jsonify({'success': True, 'action': 'shared', 'is_shared': True})
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @user_management_bp.route('/api/transponders')
+@require_user(api=True)
 def api_get_transponders():
     """API to get transponders by satellite"""
     db = get_db()
@@ -1125,18 +979,14 @@ def api_get_transponders():
 
     satellite_id = request.args.get('satellite_id', type=int)
 
-    transponders = []
-    for tp in db.list_transponders():
-        if satellite_id is None or tp['satellite_id'] == satellite_id:
-            transponders.append({
-                'id': tp['id'],
-                'name': tp['name'],
-                'freq': tp['freq'],
-                'freq_band': tp.get('freq_band'),
-                'eirp_max': tp.get('eirp_max'),
-                'polarization': tp.get('polarization')
-            })
-
-    return jsonify(transponders)
+    cols = ['id', 'name', 'freq', 'freq_band', 'eirp_max', 'polarization']
+
+    def load_data():
+        rows = db.list_transponders(satellite_id=satellite_id, columns=cols)
+        return [dict(row) for row in rows]
+
+    # Polls with unchanged transponders skip the query, and get a 304 when
+    # they send the ETag back
+    return json_cached((satellite_id,), ('transponders',), load_data)
 
 